@@ -1,15 +1,98 @@
 """Simple MSAL client for Teams bot authentication - POC version."""
+import asyncio
+import atexit
+import logging
 import os
+import stat
+import threading
+import time
 import msal
-from typing import Optional
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Seconds before expiry at which a memoized token is treated as stale
+TOKEN_EXPIRY_SKEW = 300
+
+# Lower bound between background refresh attempts, so a failing or cached response can't spin
+MIN_REFRESH_INTERVAL = 30
+
+# Cap on the exponential backoff between failed background refreshes
+MAX_REFRESH_BACKOFF = 300
+
+# Failed refreshes are retried no later than this many seconds before the token expires
+REFRESH_DEADLINE_MARGIN = 60
+
+
+def _default_cache_dir() -> str:
+    """Per-user token cache directory under XDG_CACHE_HOME (or ~/.cache)."""
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "teams-transcription-bot")
+
+
+def _load_token_cache(path: str) -> msal.SerializableTokenCache:
+    """Token cache restored from path, or an empty one if the file is missing or untrusted.
+
+    Symlinks and files owned by another user are ignored, so nobody else can plant a cache.
+    """
+    cache = msal.SerializableTokenCache()
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return cache
+    except OSError as e:
+        logger.warning("Ignoring unreadable MSAL token cache %s: %s", path, e)
+        return cache
+
+    getuid = getattr(os, "getuid", None)
+    if stat.S_ISLNK(st.st_mode) or (getuid and st.st_uid != getuid()):
+        logger.warning("Ignoring MSAL token cache %s: not a file owned by this user", path)
+        return cache
+
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+        with os.fdopen(fd, "r", encoding="utf-8") as f:
+            cache.deserialize(f.read())
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable MSAL token cache %s: %s", path, e)
+    return cache
+
+
+def _save_token_cache(cache: msal.SerializableTokenCache, path: str) -> None:
+    """Write the token cache to path, owner-readable only, if it changed.
+
+    The data goes to a freshly created temp file that is then renamed over path, so a
+    symlink planted at path is replaced rather than followed.
+    """
+    if not cache.has_state_changed:
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOFOLLOW", 0)
+        fd = os.open(tmp_path, flags, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(cache.serialize())
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning("Failed to persist MSAL token cache %s: %s", path, e)
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
 
 class MSALAuthClient:
     """Simple MSAL client for Graph API authentication."""
 
+    # One MSAL app per (tenant_id, client_id) for the whole process; building one is expensive
+    _apps: Dict[Tuple[str, str], msal.ConfidentialClientApplication] = {}
+    _apps_lock = threading.Lock()
+
     def __init__(self):
         """Initialize MSAL client with environment variables."""
         self.client_id = os.getenv("BOT_APP_ID")
@@ -17,40 +100,190 @@ class MSALAuthClient:
         self.tenant_id = os.getenv("AZURE_TENANT_ID")
 
         if not all([self.client_id, self.client_secret, self.tenant_id]):
-            raise ValueError("Missing required environment variables: BOT_APP_ID, BOT_APP_PASSWORD, AZURE_TENANT_ID")
+            raise ValueError(
+                "Missing required environment variables: "
+                "BOT_APP_ID, BOT_APP_PASSWORD, AZURE_TENANT_ID"
+            )
 
         self.authority = f"https://login.microsoftonline.com/{self.tenant_id}"
         self.scope = ["https://graph.microsoft.com/.default"]
 
-        # Create MSAL app
-        self.app = msal.ConfidentialClientApplication(
-            self.client_id,
-            authority=self.authority,
-            client_credential=self.client_secret,
+        # Token cache partitioned per (tenant, client), so MSAL only ever scans this app's tokens
+        cache_dir = os.getenv("MSAL_CACHE_DIR") or _default_cache_dir()
+        self.token_cache_path = os.path.join(
+            cache_dir, f"msal_{self.tenant_id}_{self.client_id}.bin"
         )
 
+        # Create MSAL app, or reuse the one already built for this tenant and client
+        self.app = self._get_app()
+
         self._token_cache: Optional[dict] = None
 
-    def get_token(self) -> str:
+        # Access tokens by sorted scope tuple, as (token, monotonic expiry); skips MSAL's cache walk
+        self._tokens: Dict[Tuple[str, ...], Tuple[str, float]] = {}
+        self._tokens_lock = threading.Lock()
+
+        # Monotonic time at which each memoized token should be proactively refreshed
+        self._refresh_at: Dict[Tuple[str, ...], float] = {}
+
+        # Keeps the default-scope token warm; started by get_token_async on the caller's loop
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        # Pending MSAL lookups by scope key, shared by concurrent get_token_async callers
+        self._inflight: Dict[Tuple[str, ...], asyncio.Future] = {}
+
+        # Graph headers for the current default-scope token, rebuilt only when the token changes
+        self._headers_token: Optional[str] = None
+        self._headers: Mapping[str, str] = MappingProxyType({})
+
+    def _get_app(self) -> msal.ConfidentialClientApplication:
+        """Pooled MSAL app for this tenant and client, built with its token cache on first use."""
+        key = (self.tenant_id, self.client_id)
+        with self._apps_lock:
+            app = self._apps.get(key)
+            if app is None:
+                token_cache = _load_token_cache(self.token_cache_path)
+                atexit.register(_save_token_cache, token_cache, self.token_cache_path)
+                app = msal.ConfidentialClientApplication(
+                    self.client_id,
+                    authority=self.authority,
+                    client_credential=self.client_secret,
+                    token_cache=token_cache,
+                )
+                self._apps[key] = app
+        return app
+
+    def get_token(self, scopes: Optional[List[str]] = None) -> str:
         """Get access token for Graph API."""
+        scopes = scopes or self.scope
+        key = tuple(sorted(scopes))
+
+        token = self._memoized(key)
+        if token:
+            return token
+
         # Try to get from cache first
-        result = self.app.acquire_token_silent(self.scope, account=None)
+        result = self.app.acquire_token_silent(scopes, account=None)
 
         if not result:
             # Get new token
-            result = self.app.acquire_token_for_client(scopes=self.scope)
+            result = self.app.acquire_token_for_client(scopes=scopes)
 
         if "access_token" in result:
-            self._token_cache = result
+            self._store(key, result)
             return result["access_token"]
         else:
             error_msg = result.get("error_description", result.get("error", "Unknown error"))
             raise Exception(f"Failed to get token: {error_msg}")
 
-    def get_headers(self) -> dict:
-        """Get authorization headers for Graph API requests."""
+    async def get_token_async(self, scopes: Optional[List[str]] = None) -> str:
+        """Get access token without blocking the event loop.
+
+        Concurrent callers that miss the memo share a single MSAL lookup.
+        """
+        scopes = scopes or self.scope
+        key = tuple(sorted(scopes))
+        self._start_refresh()
+
+        token = self._memoized(key)
+        if token:
+            return token
+
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.get_running_loop().run_in_executor(None, self.get_token, scopes)
+            self._inflight[key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so one cancelled caller doesn't cancel the lookup for the others
+        return await asyncio.shield(inflight)
+
+    def _memoized(self, key: Tuple[str, ...]) -> Optional[str]:
+        """Memoized token for key while it is comfortably within its lifetime."""
+        memo = self._tokens.get(key)
+        if memo and memo[1] - time.monotonic() > TOKEN_EXPIRY_SKEW:
+            return memo[0]
+        return None
+
+    def _store(self, key: Tuple[str, ...], result: dict) -> None:
+        """Memoize a successful MSAL result under its scope key, along with its refresh time."""
+        now = time.monotonic()
+        expires_in = result.get("expires_in", 0)
+
+        # Prefer the server's refresh hint (refresh_on is a Unix timestamp, refresh_in is seconds)
+        if "refresh_on" in result:
+            refresh_in = result["refresh_on"] - time.time()
+        else:
+            refresh_in = result.get("refresh_in", expires_in * 2 // 3)
+
+        with self._tokens_lock:
+            self._token_cache = result
+            self._tokens[key] = (result["access_token"], now + expires_in)
+            self._refresh_at[key] = now + refresh_in
+
+    def _start_refresh(self) -> None:
+        """Start the background refresh task on the running loop unless one is already live there.
+
+        A task left over from a loop that has since closed is done or bound to that loop,
+        so it is replaced rather than treated as running.
+        """
+        loop = asyncio.get_running_loop()
+        task = self._refresh_task
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._refresh_task = loop.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        """Re-acquire the default-scope token at its refresh time, well before it expires."""
+        key = tuple(sorted(self.scope))
+        loop = asyncio.get_running_loop()
+        backoff = MIN_REFRESH_INTERVAL
+        while True:
+            refresh_at = self._refresh_at.get(key, time.monotonic())
+            await asyncio.sleep(max(refresh_at - time.monotonic(), MIN_REFRESH_INTERVAL))
+
+            try:
+                # MSAL's network call blocks; keep it off the event loop
+                result = await loop.run_in_executor(
+                    None, lambda: self.app.acquire_token_for_client(scopes=self.scope)
+                )
+            except Exception as e:
+                result = {"error": str(e)}
+
+            if "access_token" in result:
+                self._store(key, result)
+                backoff = MIN_REFRESH_INTERVAL
+                continue
+
+            logger.warning(
+                "Background token refresh failed: %s",
+                result.get("error_description", result.get("error", "Unknown error")),
+            )
+
+            # Retry with exponential backoff, but no later than shortly before the token expires
+            memo = self._tokens.get(key)
+            retry_at = time.monotonic() + backoff
+            if memo:
+                retry_at = min(retry_at, memo[1] - REFRESH_DEADLINE_MARGIN)
+            self._refresh_at[key] = retry_at
+            backoff = min(backoff * 2, MAX_REFRESH_BACKOFF)
+
+    def close(self) -> None:
+        """Stop the background refresh task."""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+
+    def get_headers(self) -> Mapping[str, str]:
+        """Get authorization headers for Graph API requests.
+
+        The same read-only mapping is returned while the token is unchanged; copy it to modify.
+        """
         token = self.get_token()
-        return {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
\ No newline at end of file
+        if token != self._headers_token:
+            self._headers = MappingProxyType({
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json"
+            })
+            self._headers_token = token
+        return self._headers
@@ -1,16 +1,40 @@
 """Minimal Teams bot for joining calls and transcribing with diarization."""
 import os
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Set, Callable, Awaitable
 from botbuilder.core import TurnContext, ActivityHandler
 from botbuilder.schema import ChannelAccount
 import aiohttp
+import aiofiles
 import asyncio
+import orjson
 from datetime import datetime
+from src.auth.msal_client import MSALAuthClient
+from src.transcription.segment import Segment
 from src.transcription.teams_multilingual_transcriber import TeamsMultilingualTranscriber
 
 logger = logging.getLogger(__name__)
 
+# Buffered JSONL transcript lines are written out on this interval, or sooner at this size
+TRANSCRIPT_FLUSH_INTERVAL = 5.0
+TRANSCRIPT_FLUSH_BYTES = 64 * 1024
+
+# Shared Graph auth client, created on first /join and reused afterwards
+_auth_client: Optional[MSALAuthClient] = None
+
+
+def _get_auth_client() -> MSALAuthClient:
+    """Return the process-wide MSAL client, creating it on first use."""
+    global _auth_client
+    if _auth_client is None:
+        _auth_client = MSALAuthClient()
+    return _auth_client
+
+
+async def _drop_audio(audio_data: bytes) -> None:
+    """Discard audio received while no transcriber is active."""
+    return None
+
 
 class TeamsTranscriptionBot(ActivityHandler):
     """MVP Teams bot that joins calls and transcribes with speaker diarization."""
@@ -18,33 +42,56 @@ class TeamsTranscriptionBot(ActivityHandler):
     def __init__(self):
         super().__init__()
         self.active_call: Optional[Dict[str, Any]] = None
-        self.transcriber: Optional['TeamsMultilingualTranscriber'] = None
-        self.transcript_entries: List[Dict[str, Any]] = []
+        self._process_audio: Callable[[bytes], Awaitable[None]] = _drop_audio
+        self._transcriber: Optional['TeamsMultilingualTranscriber'] = None
+        self.transcript_entries: List[Segment] = []
+        self._languages_seen: Set[str] = set()
         self.graph_token: Optional[str] = None
 
+        # Incremental JSONL transcript; segments are buffered and flushed in batches
+        self._jsonl: Optional[Any] = None
+        self._jsonl_path: Optional[str] = None
+        self._jsonl_buffer = bytearray()
+        self._jsonl_flush_task: Optional[asyncio.Task] = None
+        # Serializes writes so batches reach the file in order; set _jsonl_closing to stop the task
+        self._jsonl_lock = asyncio.Lock()
+        self._jsonl_closing = asyncio.Event()
+
+    @property
+    def transcriber(self) -> Optional['TeamsMultilingualTranscriber']:
+        """Active transcriber, if any."""
+        return self._transcriber
+
+    @transcriber.setter
+    def transcriber(self, transcriber: Optional['TeamsMultilingualTranscriber']) -> None:
+        # Bind the audio sink once so the per-chunk path needs no branch or lookup
+        self._transcriber = transcriber
+        self._process_audio = transcriber.process_audio if transcriber else _drop_audio
+
     async def on_message_activity(self, turn_context: TurnContext) -> None:
         """Handle incoming messages from Teams."""
-        text = turn_context.activity.text.lower() if turn_context.activity.text else ""
+        text = turn_context.activity.text or ""
+
+        # Only the command word is case-insensitive; the meeting URL keeps its original case
+        command = text[:7].lower()
 
-        if text.startswith("/join "):
-            await self._handle_join_call(turn_context, text)
-        elif text.startswith("/leave"):
+        if command.startswith("/join "):
+            await self._handle_join_call(turn_context, text[6:].strip())
+        elif command.startswith("/leave"):
             await self._handle_leave_call(turn_context)
-        elif text.startswith("/status"):
+        elif command.startswith("/status"):
             await self._handle_status(turn_context)
         else:
             await turn_context.send_activity(
                 "Commands: /join <meeting_url>, /leave, /status"
             )
 
-    async def _handle_join_call(self, turn_context: TurnContext, text: str) -> None:
+    async def _handle_join_call(self, turn_context: TurnContext, meeting_url: str) -> None:
         """Join a Teams call and start transcription."""
         if self.active_call:
             await turn_context.send_activity("Already in a call. Use /leave first.")
             return
 
-        # Extract meeting URL
-        meeting_url = text.replace("/join ", "").strip()
         if not meeting_url.startswith("https://teams.microsoft.com"):
             await turn_context.send_activity("Invalid Teams meeting URL.")
             return
@@ -58,9 +105,7 @@ class TeamsTranscriptionBot(ActivityHandler):
             }
 
             # Get Graph API token
-            from src.auth.msal_client import MSALAuthClient
-            auth_client = MSALAuthClient()
-            self.graph_token = auth_client.get_token()
+            self.graph_token = await _get_auth_client().get_token_async()
 
             # Join the Teams call via Graph API
             await self._join_teams_call_via_graph(meeting_url)
@@ -70,16 +115,26 @@ class TeamsTranscriptionBot(ActivityHandler):
                 language='auto',  # Auto-detect Spanish, German, English
                 on_transcription_callback=self.on_transcription_received
             )
+
+            # Stream segments to disk as they arrive instead of only at /leave; the file is
+            # opened before recognition starts so segments from startup are not missed
+            self._jsonl_path = f"teams_transcript_{self.transcriber.session_id}.jsonl"
+            self._jsonl = await aiofiles.open(self._jsonl_path, "ab")
+            self._jsonl_closing.clear()
+            self._jsonl_flush_task = asyncio.create_task(self._flush_transcript_periodically())
+
             await self.transcriber.start_transcription()
 
             await turn_context.send_activity(
-                f"✅ Joined call and started multilingual transcription (🇪🇸 🇩🇪 🇺🇸) with speaker diarization."
+                "✅ Joined call and started multilingual transcription (🇪🇸 🇩🇪 🇺🇸) "
+                "with speaker diarization."
             )
             logger.info(f"Bot joined call: {meeting_url}")
 
         except Exception as e:
             self.active_call = None
             self.transcriber = None
+            await self._close_transcript_stream()
             await turn_context.send_activity(f"❌ Failed to join call: {str(e)}")
             logger.error(f"Failed to join call: {e}")
 
@@ -110,6 +165,7 @@ class TeamsTranscriptionBot(ActivityHandler):
             # Stop transcription and save files
             session_summary = {}
             saved_files = []
+            audio_file = None
             if self.transcriber:
                 session_summary = await self.transcriber.stop_transcription()
                 result = await self.transcriber.save_transcript_files()
@@ -117,20 +173,25 @@ class TeamsTranscriptionBot(ActivityHandler):
                     json_file, txt_file = result[0], result[1]
                     saved_files = [txt_file, json_file]
                     # Check if audio file was also saved
-                    if len(result) > 2 and result[2]:
-                        audio_file = result[2]
+                    audio_file = result[2] if len(result) > 2 else None
+                    if audio_file:
                         saved_files.append(audio_file)
                 self.transcriber = None
 
+            jsonl_file = await self._close_transcript_stream()
+            if jsonl_file:
+                saved_files.append(jsonl_file)
+
             # Prepare transcript summary
             total_segments = session_summary.get('total_segments', len(self.transcript_entries))
             total_speakers = session_summary.get('total_speakers', 0)
             languages = session_summary.get('languages_detected', [])
 
             # Include file information in summary
-            files_info = f"📄 Files saved: {len(saved_files)} files" if saved_files else "No files saved"
-            has_audio = any("wav" in str(f) for f in saved_files)
-            audio_info = " (🎵 includes audio)" if has_audio else ""
+            files_info = (
+                f"📄 Files saved: {len(saved_files)} files" if saved_files else "No files saved"
+            )
+            audio_info = " (🎵 includes audio)" if audio_file else ""
 
             transcript_summary = (
                 f"📝 Transcript saved: {total_segments} segments, {total_speakers} speakers\n"
@@ -141,6 +202,7 @@ class TeamsTranscriptionBot(ActivityHandler):
             # Clear state
             self.active_call = None
             self.transcript_entries = []
+            self._languages_seen.clear()
 
             await turn_context.send_activity(
                 f"✅ Left call. {transcript_summary}"
@@ -151,6 +213,47 @@ class TeamsTranscriptionBot(ActivityHandler):
             await turn_context.send_activity(f"❌ Error leaving call: {str(e)}")
             logger.error(f"Failed to leave call: {e}")
 
+    async def _flush_transcript(self) -> None:
+        """Write buffered JSONL lines to the transcript file in one call, one flush at a time."""
+        async with self._jsonl_lock:
+            if self._jsonl is None or not self._jsonl_buffer:
+                return
+
+            data = bytes(self._jsonl_buffer)
+            self._jsonl_buffer.clear()
+            await self._jsonl.write(data)
+
+    async def _flush_transcript_periodically(self) -> None:
+        """Flush the JSONL buffer every TRANSCRIPT_FLUSH_INTERVAL seconds until the call ends."""
+        while not self._jsonl_closing.is_set():
+            try:
+                await asyncio.wait_for(self._jsonl_closing.wait(), TRANSCRIPT_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                await self._flush_transcript()
+
+    async def _close_transcript_stream(self) -> Optional[str]:
+        """Flush, fsync and close the incremental JSONL transcript and return its path."""
+        # Let the flush task finish any write in progress rather than cancelling it mid-write
+        if self._jsonl_flush_task is not None:
+            self._jsonl_closing.set()
+            await self._jsonl_flush_task
+            self._jsonl_flush_task = None
+
+        if self._jsonl is None:
+            self._jsonl_buffer.clear()
+            return None
+
+        await self._flush_transcript()
+        async with self._jsonl_lock:
+            await self._jsonl.flush()
+            # One fsync for the whole call rather than per write
+            await asyncio.to_thread(os.fsync, self._jsonl.fileno())
+            await self._jsonl.close()
+            path = self._jsonl_path
+            self._jsonl = None
+            self._jsonl_path = None
+        return path
+
     async def _handle_status(self, turn_context: TurnContext) -> None:
         """Report current bot status."""
         if self.active_call:
@@ -160,12 +263,9 @@ class TeamsTranscriptionBot(ActivityHandler):
             languages = []
 
             if self.transcriber and hasattr(self.transcriber, 'transcript_segments'):
-                segments_count = len(self.transcriber.transcript_segments)
+                segments_count = self.transcriber.segment_counter
                 speakers_count = self.transcriber.speaker_counter
-                languages = list(set([
-                    seg.get("detected_language", "unknown")
-                    for seg in self.transcriber.transcript_segments
-                ]))
+                languages = list(self._languages_seen)
 
             status = (
                 f"📞 In call since: {self.active_call['joined_at']}\n"
@@ -174,24 +274,29 @@ class TeamsTranscriptionBot(ActivityHandler):
                 f"🎯 Multilingual mode: Spanish 🇪🇸 German 🇩🇪 English 🇺🇸"
             )
         else:
-            status = "🔴 Not in a call\n🎯 Ready for multilingual transcription (🇪🇸 🇩🇪 🇺🇸)"
+            status = (
+                "🔴 Not in a call\n"
+                "🎯 Ready for multilingual transcription (🇪🇸 🇩🇪 🇺🇸)"
+            )
 
         await turn_context.send_activity(status)
 
     async def process_audio_stream(self, audio_data: bytes) -> None:
         """Process incoming audio stream from Teams call."""
-        if self.transcriber:
-            await self.transcriber.process_audio(audio_data)
+        await self._process_audio(audio_data)
 
-    async def on_transcription_received(self, transcription_result: Dict[str, Any]) -> None:
+    async def on_transcription_received(self, segment: Segment) -> None:
         """Handle transcription results with speaker diarization."""
         # Store transcription with speaker identification
-        self.transcript_entries.append(transcription_result)
+        self.transcript_entries.append(segment)
+        self._languages_seen.add(segment.detected_language)
+
+        # Always buffer; _flush_transcript holds lines back until the file is open
+        self._jsonl_buffer += orjson.dumps(segment) + b"\n"
+        if len(self._jsonl_buffer) >= TRANSCRIPT_FLUSH_BYTES:
+            await self._flush_transcript()
 
-        logger.info(
-            f"Transcription: Speaker {transcription_result.get('speaker_id')}: "
-            f"{transcription_result.get('text')}"
-        )
+        logger.info("Transcription: Speaker %s: %s", segment.speaker_id, segment.text)
 
     async def on_members_added_activity(
         self, members_added: List[ChannelAccount], turn_context: TurnContext
@@ -201,7 +306,8 @@ class TeamsTranscriptionBot(ActivityHandler):
             if member.id != turn_context.activity.recipient.id:
                 await turn_context.send_activity(
                     "👋 Hi! I'm the Teams Transcription Bot.\n"
-                    "I can join calls and provide real-time transcription with speaker identification.\n\n"
+                    "I can join calls and provide real-time transcription "
+                    "with speaker identification.\n\n"
                     "Commands:\n"
                     "• `/join <meeting_url>` - Join a Teams call\n"
                     "• `/leave` - Leave current call\n"
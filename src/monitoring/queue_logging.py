@@ -0,0 +1,25 @@
+"""Queue-backed logging for scripts that log from Speech SDK callback threads."""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+
+def start_queue_logging(
+    logger: logging.Logger, level: int = logging.INFO
+) -> logging.handlers.QueueListener:
+    """Route logger through a queue to a stdout listener thread that is stopped at exit.
+
+    Callbacks then only enqueue records; the listener thread does the actual writes.
+    Call this from a script's entry point, not at import time.
+    """
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    listener.start()
+    atexit.register(listener.stop)
+
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+    return listener
@@ -2,6 +2,8 @@
 import os
 import logging
 import asyncio
+import operator
+from array import array
 from typing import Optional, Callable, Dict, Any
 from dotenv import load_dotenv
 import azure.cognitiveservices.speech as speechsdk
@@ -49,9 +51,19 @@ class AzureSpeechTranscriber:
         # Callback for transcription results
         self.on_transcription_callback = on_transcription_callback
 
+        # Event loop that SDK callback threads hand results back to
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
         # Transcription state
         self.is_transcribing = False
-        self.transcript_entries = []
+
+        # Transcript stored column-wise; numeric fields live in packed arrays
+        self._speaker_ids: list = []
+        self._texts: list = []
+        self._timestamps: list = []
+        self._confidences = array('d')
+        self._offsets = array('q')
+        self._durations = array('q')
 
         logger.info("Azure Speech transcriber initialized successfully")
 
@@ -62,6 +74,8 @@ class AzureSpeechTranscriber:
                 logger.warning("Transcription already running")
                 return
 
+            self._loop = asyncio.get_running_loop()
+
             # Use default microphone for now (can be modified for Teams audio stream)
             self.audio_config = speechsdk.AudioConfig(use_default_microphone=True)
 
@@ -117,41 +131,66 @@ class AzureSpeechTranscriber:
         if not self.is_transcribing:
             return
 
-        logger.debug(f"Processing {len(audio_data)} bytes of audio data")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Processing %d bytes of audio data", len(audio_data))
         # Real implementation would feed this to AudioInputStream
 
     def _setup_event_handlers(self) -> None:
         """Set up event handlers for real-time transcription results."""
+        # Bound once per session instead of hasattr/getattr on every utterance
+        get_speaker = operator.attrgetter('speaker_id')
+        get_confidence = operator.attrgetter('confidence')
 
         def handle_transcribed(evt):
             """Handle final transcription results."""
-            if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+            result = evt.result
+            if result.reason == speechsdk.ResultReason.RecognizedSpeech:
+                try:
+                    speaker_id = get_speaker(result)
+                except AttributeError:
+                    speaker_id = "Unknown"
+                try:
+                    confidence = get_confidence(result)
+                except AttributeError:
+                    confidence = 0.0
+
                 transcription_result = {
-                    "speaker_id": evt.result.speaker_id if hasattr(evt.result, 'speaker_id') else "Unknown",
-                    "text": evt.result.text,
+                    "speaker_id": speaker_id,
+                    "text": result.text,
                     "timestamp": datetime.utcnow().isoformat(),
-                    "confidence": getattr(evt.result, 'confidence', 0.0),
-                    "offset": evt.result.offset,
-                    "duration": evt.result.duration
+                    "confidence": confidence,
+                    "offset": result.offset,
+                    "duration": result.duration
                 }
 
                 # Store locally
-                self.transcript_entries.append(transcription_result)
+                self._speaker_ids.append(transcription_result["speaker_id"])
+                self._texts.append(transcription_result["text"])
+                self._timestamps.append(transcription_result["timestamp"])
+                self._confidences.append(transcription_result["confidence"])
+                self._offsets.append(transcription_result["offset"])
+                self._durations.append(transcription_result["duration"])
 
                 # Call callback if provided
                 if self.on_transcription_callback:
                     try:
-                        # Run callback in async context
-                        asyncio.create_task(self.on_transcription_callback(transcription_result))
+                        # Run callback on the event loop; this handler runs on an SDK thread
+                        asyncio.run_coroutine_threadsafe(
+                            self.on_transcription_callback(transcription_result), self._loop
+                        )
                     except Exception as e:
                         logger.error(f"Error in transcription callback: {e}")
 
-                logger.info(f"Transcription: {transcription_result['speaker_id']}: {transcription_result['text']}")
+                logger.info(
+                    "Transcription: %s: %s",
+                    transcription_result.get('speaker_id'),
+                    transcription_result.get('text')
+                )
 
         def handle_transcribing(evt):
             """Handle interim transcription results."""
             if evt.result.reason == speechsdk.ResultReason.RecognizingSpeech:
-                logger.debug(f"Transcribing: {evt.result.text}")
+                logger.debug("Transcribing: %s", evt.result.text)
 
         def handle_canceled(evt):
             """Handle cancellation events."""
@@ -172,11 +211,29 @@ class AzureSpeechTranscriber:
 
     def get_transcript(self) -> list:
         """Get current transcript entries."""
-        return self.transcript_entries.copy()
+        return [
+            {
+                "speaker_id": speaker_id,
+                "text": text,
+                "timestamp": timestamp,
+                "confidence": confidence,
+                "offset": offset,
+                "duration": duration
+            }
+            for speaker_id, text, timestamp, confidence, offset, duration in zip(
+                self._speaker_ids, self._texts, self._timestamps,
+                self._confidences, self._offsets, self._durations
+            )
+        ]
 
     def clear_transcript(self) -> None:
         """Clear transcript entries."""
-        self.transcript_entries.clear()
+        self._speaker_ids.clear()
+        self._texts.clear()
+        self._timestamps.clear()
+        del self._confidences[:]
+        del self._offsets[:]
+        del self._durations[:]
         logger.info("Transcript cleared")
 
     async def create_audio_stream_config(self, audio_format: str = "wav") -> speechsdk.AudioConfig:
@@ -0,0 +1,16 @@
+"""Transcript segment record shared by the transcriber and the bot."""
+from dataclasses import dataclass
+
+
+@dataclass(slots=True, frozen=True)
+class Segment:
+    """A single finalized utterance with speaker and language information."""
+
+    segment_id: int
+    speaker_id: str
+    text: str
+    start_time: str
+    confidence: float
+    duration_ms: int = 0
+    offset_ms: int = 0
+    detected_language: str = "unknown"
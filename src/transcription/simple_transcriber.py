@@ -2,6 +2,7 @@
 import os
 import logging
 import asyncio
+import random
 from typing import Optional, Callable, Dict, Any
 from dotenv import load_dotenv
 from datetime import datetime
@@ -9,6 +10,14 @@ from datetime import datetime
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+MOCK_TEXTS = (
+    "This is a mock transcription",
+    "The meeting is going well",
+    "Can everyone hear me clearly?",
+    "Let's discuss the next agenda item",
+    "I'll share my screen now"
+)
+
 
 class SimpleSpeechTranscriber:
     """Simple MVP transcriber that mocks speech-to-text for development."""
@@ -18,6 +27,7 @@ class SimpleSpeechTranscriber:
         self.on_transcription_callback = on_transcription_callback
         self.is_transcribing = False
         self.transcript_entries = []
+        self._rng = random.Random()
 
         # Mock speech service credentials check
         speech_key = os.getenv("AZURE_SPEECH_KEY")
@@ -81,24 +91,14 @@ class SimpleSpeechTranscriber:
         if not self.is_transcribing:
             return
 
-        # Mock processing with random speaker changes
-        import random
-
-        if random.random() < 0.1:  # 10% chance of mock transcription
-            speaker_id = f"Speaker_{random.randint(1, 3)}"
-            mock_texts = [
-                "This is a mock transcription",
-                "The meeting is going well",
-                "Can everyone hear me clearly?",
-                "Let's discuss the next agenda item",
-                "I'll share my screen now"
-            ]
-
+        # One random draw per chunk: low byte triggers, higher bits pick speaker and text
+        bits = self._rng.getrandbits(32)
+        if (bits & 0xFF) < 26:  # ~10% chance of mock transcription
             mock_result = {
-                "speaker_id": speaker_id,
-                "text": random.choice(mock_texts),
+                "speaker_id": f"Speaker_{1 + ((bits >> 8) & 0xFF) % 3}",
+                "text": MOCK_TEXTS[(bits >> 16) % len(MOCK_TEXTS)],
                 "timestamp": datetime.utcnow().isoformat(),
-                "confidence": round(random.uniform(0.8, 0.99), 2)
+                "confidence": round(self._rng.uniform(0.8, 0.99), 2)
             }
 
             if self.on_transcription_callback:
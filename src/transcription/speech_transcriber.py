@@ -2,6 +2,8 @@
 import os
 import logging
 import asyncio
+import time
+from collections import deque
 from typing import Optional, Callable
 from dotenv import load_dotenv
 import azure.cognitiveservices.speech as speechsdk
@@ -10,10 +12,25 @@ from datetime import datetime
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Queued after the last audio chunk at stop; the writer returns once it reaches it
+_END_OF_AUDIO = object()
+
 
 class SpeechTranscriber:
     """Real Azure Speech-to-Text transcriber with speaker diarization."""
 
+    # Max audio chunks buffered between the event loop and the push stream
+    WRITE_QUEUE_SIZE = 32
+
+    # 16kHz, 16-bit mono PCM; audio is pushed to Azure no faster than real time
+    BYTES_PER_SECOND = 32000
+
+    # Seconds stop_transcription waits for queued audio to reach the push stream
+    WRITE_DRAIN_TIMEOUT = 5.0
+
+    # Max transcription results kept in memory; older results are dropped
+    MAX_SEGMENTS = 10000
+
     def __init__(self, on_transcription_callback: Optional[Callable] = None):
         """Initialize Speech transcriber with Azure credentials."""
         # Load Azure Speech credentials
@@ -53,11 +70,19 @@ class SpeechTranscriber:
         # Conversation transcriber for speaker diarization
         self.conversation_transcriber: Optional[speechsdk.transcription.ConversationTranscriber] = None
         self.conversation: Optional[speechsdk.transcription.Conversation] = None
+        self._conn: Optional[speechsdk.Connection] = None
         self.on_transcription = on_transcription_callback
 
         # Track transcription state
         self.is_transcribing = False
-        self.transcription_results = []
+        self.transcription_results: deque = deque(maxlen=self.MAX_SEGMENTS)
+
+        # Audio chunks are queued here and pushed to Azure by a single writer task
+        self._write_queue: asyncio.Queue = asyncio.Queue(maxsize=self.WRITE_QUEUE_SIZE)
+        self._writer_task: Optional[asyncio.Task] = None
+
+        # Event loop that SDK callback threads hand results back to
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
 
     async def start_transcription(self) -> None:
         """Start real-time transcription with speaker diarization."""
@@ -66,10 +91,14 @@ class SpeechTranscriber:
             return
 
         try:
+            self._loop = asyncio.get_running_loop()
+
             # Create conversation for multi-speaker transcription
-            self.conversation = speechsdk.transcription.Conversation.create_conversation_async(
-                speech_config=self.speech_config
-            ).get()
+            self.conversation = await asyncio.to_thread(
+                lambda: speechsdk.transcription.Conversation.create_conversation_async(
+                    speech_config=self.speech_config
+                ).get()
+            )
 
             # Create conversation transcriber
             self.conversation_transcriber = speechsdk.transcription.ConversationTranscriber(
@@ -77,20 +106,23 @@ class SpeechTranscriber:
             )
 
             # Join conversation
-            await asyncio.get_event_loop().run_in_executor(
-                None,
-                self.conversation_transcriber.join_conversation_async,
-                self.conversation
+            await asyncio.to_thread(
+                lambda: self.conversation_transcriber.join_conversation_async(
+                    self.conversation
+                ).get()
             )
 
             # Set up event handlers
             self._setup_event_handlers()
 
+            # Open the service connection now so the first utterance skips the handshake
+            self._conn = speechsdk.Connection.from_recognizer(self.conversation_transcriber)
+            self._conn.open(True)
+
             # Start continuous recognition
-            await asyncio.get_event_loop().run_in_executor(
-                None,
-                self.conversation_transcriber.start_transcribing_async().get
-            )
+            await asyncio.to_thread(self.conversation_transcriber.start_transcribing_async().get)
+
+            self._writer_task = asyncio.create_task(self._drain_writes())
 
             self.is_transcribing = True
             logger.info("Started Azure Speech-to-Text transcription with speaker diarization")
@@ -104,24 +136,40 @@ class SpeechTranscriber:
         if not self.is_transcribing:
             return
 
+        # Stop accepting audio so nothing lands behind the end-of-audio marker
+        self.is_transcribing = False
+
         try:
+            if self._writer_task:
+                # Let the writer push the trailing audio still queued before the stream closes
+                try:
+                    await asyncio.wait_for(self._finish_writes(), timeout=self.WRITE_DRAIN_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logger.warning("Timed out pushing queued audio; dropping the remainder")
+                if not self._writer_task.done():
+                    self._writer_task.cancel()
+                try:
+                    await self._writer_task
+                except asyncio.CancelledError:
+                    pass
+                self._writer_task = None
+
             if self.conversation_transcriber:
                 # Stop transcription
-                await asyncio.get_event_loop().run_in_executor(
-                    None,
-                    self.conversation_transcriber.stop_transcribing_async().get
-                )
+                await asyncio.to_thread(self.conversation_transcriber.stop_transcribing_async().get)
 
                 # Leave conversation
-                await asyncio.get_event_loop().run_in_executor(
-                    None,
+                await asyncio.to_thread(
                     self.conversation_transcriber.leave_conversation_async().get
                 )
 
+            if self._conn:
+                self._conn.close()
+                self._conn = None
+
             # Close push stream
             self.push_stream.close()
 
-            self.is_transcribing = False
             logger.info("Stopped transcription")
 
         except Exception as e:
@@ -133,12 +181,40 @@ class SpeechTranscriber:
             logger.warning("Transcriber not running, cannot process audio")
             return
 
+        # Never block the loop: when the writer falls behind, drop the oldest chunk
         try:
-            # Push audio data to Azure Speech service
-            self.push_stream.write(audio_data)
-
-        except Exception as e:
-            logger.error(f"Error processing audio: {e}")
+            self._write_queue.put_nowait(audio_data)
+        except asyncio.QueueFull:
+            self._write_queue.get_nowait()
+            self._write_queue.put_nowait(audio_data)
+
+    async def _finish_writes(self) -> None:
+        """Queue the end-of-audio marker and wait for the writer to reach it."""
+        await self._write_queue.put(_END_OF_AUDIO)
+        await self._writer_task
+
+    async def _drain_writes(self) -> None:
+        """Push queued audio chunks to the Azure Speech service until the end-of-audio marker."""
+        start = time.monotonic()
+        bytes_written = 0
+        while True:
+            chunk = await self._write_queue.get()
+            if chunk is _END_OF_AUDIO:
+                return
+
+            # Pace writes to 1x real time so the service buffer never overflows
+            delay = bytes_written / self.BYTES_PER_SECOND - (time.monotonic() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            elif delay < 0:
+                # Behind schedule (e.g. a gap in the call audio): re-anchor, don't burst
+                start = time.monotonic() - bytes_written / self.BYTES_PER_SECOND
+            bytes_written += len(chunk)
+
+            try:
+                await asyncio.to_thread(self.push_stream.write, chunk)
+            except Exception as e:
+                logger.error(f"Error processing audio: {e}")
 
     def _setup_event_handlers(self) -> None:
         """Set up event handlers for transcription results."""
@@ -159,13 +235,13 @@ class SpeechTranscriber:
 
                 # Callback to bot if provided
                 if self.on_transcription:
-                    asyncio.create_task(self.on_transcription(result))
+                    asyncio.run_coroutine_threadsafe(self.on_transcription(result), self._loop)
 
-                logger.info(f"[Speaker {result['speaker_id']}]: {result['text']}")
+                logger.info("[Speaker %s]: %s", result['speaker_id'], result['text'])
 
         def handle_transcribing(evt):
             """Handle interim transcription results."""
-            logger.debug(f"Transcribing: {evt.result.text}")
+            logger.debug("Transcribing: %s", evt.result.text)
 
         def handle_canceled(evt):
             """Handle cancellation events."""
@@ -180,13 +256,15 @@ class SpeechTranscriber:
 
         # Connect event handlers
         self.conversation_transcriber.transcribed.connect(handle_transcribed)
-        self.conversation_transcriber.transcribing.connect(handle_transcribing)
+        if logger.isEnabledFor(logging.DEBUG):
+            # Interim results fire at word rate and are only ever logged at DEBUG
+            self.conversation_transcriber.transcribing.connect(handle_transcribing)
         self.conversation_transcriber.canceled.connect(handle_canceled)
         self.conversation_transcriber.session_stopped.connect(handle_session_stopped)
 
     def get_transcript(self) -> list:
         """Get the full transcript with speaker diarization."""
-        return self.transcription_results.copy()
+        return list(self.transcription_results)
 
     def clear_transcript(self) -> None:
         """Clear stored transcript."""
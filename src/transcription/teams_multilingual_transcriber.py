@@ -2,13 +2,16 @@
 """Teams-compatible multilingual transcriber supporting Spanish, German, and English."""
 import asyncio
 import os
-import json
+import time
 import wave
 import threading
+from collections import deque
 from datetime import datetime, UTC
-from typing import Optional, Callable, Dict, Any, List
+from typing import Optional, Callable, Dict, Any, Deque, List
 from dotenv import load_dotenv
+import orjson
 import azure.cognitiveservices.speech as speechsdk
+from src.transcription.segment import Segment
 try:
     import pyaudio
     PYAUDIO_AVAILABLE = True
@@ -29,6 +32,16 @@ class TeamsMultilingualTranscriber:
         'auto': 'auto-detect'
     }
 
+    LANGUAGE_FLAGS = {
+        "es-ES": "🇪🇸",
+        "de-DE": "🇩🇪",
+        "en-US": "🇺🇸",
+        "unknown": "🌍"
+    }
+
+    # Max segments kept in memory; older segments are dropped on long sessions
+    MAX_SEGMENTS = 10000
+
     def __init__(self, language='auto', on_transcription_callback: Optional[Callable] = None):
         """Initialize with language preference and callback."""
         self.speech_key = os.getenv("AZURE_SPEECH_KEY")
@@ -36,8 +49,12 @@ class TeamsMultilingualTranscriber:
         self.language = language
         self.on_transcription_callback = on_transcription_callback
         self.recognizer = None
+        self._conn: Optional[speechsdk.Connection] = None
         self.is_transcribing = False
 
+        # Event loop that SDK callback threads hand results back to
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
         # Speaker diarization state
         self.segment_counter = 0
         self.speaker_counter = 0
@@ -46,21 +63,27 @@ class TeamsMultilingualTranscriber:
         # Session tracking
         self.session_id = f"teams_multilingual_{datetime.now(UTC).strftime('%Y%m%d_%H%M%S')}"
         self.session_start = datetime.now(UTC)
-        self.transcript_segments: List[Dict[str, Any]] = []
+        self.transcript_segments: Deque[Segment] = deque(maxlen=self.MAX_SEGMENTS)
+        self._languages_detected: set = set()
 
         # Audio recording for corroboration
         self.audio_recording = PYAUDIO_AVAILABLE  # Enable only if PyAudio is available
-        self.audio_frames = []
-        self.audio_thread = None
+        self._pyaudio = None
         self.audio_stream = None
         self.recording_active = False
 
+        # Captured audio is streamed straight into this WAV file while recording
+        self.audio_filename: Optional[str] = None
+        self._wave_file: Optional[wave.Wave_write] = None
+        self._wave_lock = threading.Lock()
+
         # Audio settings (16kHz mono for Azure Speech compatibility)
         if PYAUDIO_AVAILABLE:
             self.audio_format = pyaudio.paInt16
         else:
             self.audio_format = None
         self.audio_channels = 1
+        self.audio_sample_width = 2  # bytes per paInt16 sample
         self.audio_rate = 16000
         self.audio_chunk = 1024
 
@@ -69,43 +92,48 @@ class TeamsMultilingualTranscriber:
         if self.is_transcribing:
             return
 
+        self._loop = asyncio.get_running_loop()
+
         # Setup speech config
         speech_config = speechsdk.SpeechConfig(
             subscription=self.speech_key,
             region=self.speech_region
         )
 
+        # Enhanced settings for better recognition; must be set before the recognizer is built
+        speech_config.set_property(
+            speechsdk.PropertyId.SpeechServiceConnection_InitialSilenceTimeoutMs, "5000"
+        )
+        speech_config.set_property(
+            speechsdk.PropertyId.SpeechServiceConnection_EndSilenceTimeoutMs, "500"
+        )
+
+        audio_config = speechsdk.AudioConfig(use_default_microphone=True)
+        recognizer_kwargs = {"speech_config": speech_config, "audio_config": audio_config}
+
         if self.language == 'auto':
             # Enable auto language detection for Spanish, German, English
-            auto_detect_config = speechsdk.languageconfig.AutoDetectSourceLanguageConfig(
-                languages=["es-ES", "de-DE", "en-US"]
-            )
-
-            audio_config = speechsdk.AudioConfig(use_default_microphone=True)
-            self.recognizer = speechsdk.SpeechRecognizer(
-                speech_config=speech_config,
-                auto_detect_source_language_config=auto_detect_config,
-                audio_config=audio_config
+            recognizer_kwargs["auto_detect_source_language_config"] = (
+                speechsdk.languageconfig.AutoDetectSourceLanguageConfig(
+                    languages=["es-ES", "de-DE", "en-US"]
+                )
             )
         else:
             # Set specific language
-            speech_lang = self.SUPPORTED_LANGUAGES.get(self.language, 'en-US')
-            speech_config.speech_recognition_language = speech_lang
-
-            audio_config = speechsdk.AudioConfig(use_default_microphone=True)
-            self.recognizer = speechsdk.SpeechRecognizer(
-                speech_config=speech_config,
-                audio_config=audio_config
+            speech_config.speech_recognition_language = self.SUPPORTED_LANGUAGES.get(
+                self.language, 'en-US'
             )
 
-        # Enhanced settings for better recognition
-        speech_config.set_property(speechsdk.PropertyId.SpeechServiceConnection_InitialSilenceTimeoutMs, "5000")
-        speech_config.set_property(speechsdk.PropertyId.SpeechServiceConnection_EndSilenceTimeoutMs, "500")
+        self.recognizer = speechsdk.SpeechRecognizer(**recognizer_kwargs)
 
         # Connect event handlers
         self.recognizer.recognized.connect(self._on_recognized)
         self.recognizer.recognizing.connect(self._on_recognizing)
 
+        # Open the service connection now so the first utterance skips the handshake
+        self._conn = speechsdk.Connection.from_recognizer(self.recognizer)
+        self._conn.open(True)
+
         # Start audio recording if enabled
         if self.audio_recording:
             self._start_audio_recording()
@@ -122,6 +150,10 @@ class TeamsMultilingualTranscriber:
         self.recognizer.stop_continuous_recognition()
         self.is_transcribing = False
 
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
         # Stop audio recording
         if self.audio_recording:
             self._stop_audio_recording()
@@ -131,13 +163,10 @@ class TeamsMultilingualTranscriber:
             "start_time": self.session_start.isoformat(),
             "end_time": datetime.now(UTC).isoformat(),
             "language_setting": self.language,
-            "total_segments": len(self.transcript_segments),
+            "total_segments": self.segment_counter,
             "total_speakers": self.speaker_counter,
-            "languages_detected": list(set([
-                seg.get("detected_language", "unknown")
-                for seg in self.transcript_segments
-            ])),
-            "segments": self.transcript_segments
+            "languages_detected": list(self._languages_detected),
+            "segments": list(self.transcript_segments)
         }
 
         return session_summary
@@ -148,6 +177,7 @@ class TeamsMultilingualTranscriber:
             text = evt.result.text.strip()
             if text:
                 current_time = datetime.now(UTC)
+                now_mono = time.monotonic()
 
                 # Detect language from result if available
                 detected_language = "unknown"
@@ -159,29 +189,38 @@ class TeamsMultilingualTranscriber:
                         detected_language = lang_result
 
                 # Speaker diarization (3+ second gap = new speaker)
-                if (self.last_speech_time is None or
-                    (current_time.timestamp() - self.last_speech_time) > 3):
+                new_speaker = (
+                    self.last_speech_time is None or now_mono - self.last_speech_time > 3
+                )
+                if new_speaker:
                     self.speaker_counter += 1
 
-                self.last_speech_time = current_time.timestamp()
+                self.last_speech_time = now_mono
                 self.segment_counter += 1
 
-                segment = {
-                    "segment_id": self.segment_counter,
-                    "speaker_id": f"Speaker_{self.speaker_counter}",
-                    "text": text,
-                    "detected_language": detected_language,
-                    "start_time": current_time.isoformat(),
-                    "confidence": 0.95,
-                    "duration_ms": int(evt.result.duration / 10000),
-                    "offset_ms": int(evt.result.offset / 10000)
-                }
+                # SDK offset/duration are integer 100-ns ticks
+                offset_ms = evt.result.offset // 10000
+                duration_ms = evt.result.duration // 10000
+
+                segment = Segment(
+                    segment_id=self.segment_counter,
+                    speaker_id=f"Speaker_{self.speaker_counter}",
+                    text=text,
+                    start_time=current_time.isoformat(),
+                    confidence=0.95,
+                    duration_ms=duration_ms,
+                    offset_ms=offset_ms,
+                    detected_language=detected_language
+                )
 
                 self.transcript_segments.append(segment)
+                self._languages_detected.add(detected_language)
 
-                # Call the callback if provided
+                # Call the callback on the event loop; this handler runs on an SDK thread
                 if self.on_transcription_callback:
-                    asyncio.create_task(self.on_transcription_callback(segment))
+                    asyncio.run_coroutine_threadsafe(
+                        self.on_transcription_callback(segment), self._loop
+                    )
 
     def _on_recognizing(self, evt) -> None:
         """Handle partial recognition results."""
@@ -196,19 +235,16 @@ class TeamsMultilingualTranscriber:
 
     def get_language_flag(self, language_code: str) -> str:
         """Get emoji flag for language."""
-        flags = {
-            "es-ES": "🇪🇸",
-            "de-DE": "🇩🇪",
-            "en-US": "🇺🇸",
-            "unknown": "🌍"
-        }
-        return flags.get(language_code, "🌍")
+        return self.LANGUAGE_FLAGS.get(language_code, "🌍")
 
     async def save_transcript_files(self, prefix: Optional[str] = None) -> tuple:
         """Save transcript to JSON and TXT files."""
         if not prefix:
             prefix = f"teams_transcript_{self.session_id}"
 
+        # Snapshot segments; the SDK thread may still append while files are written
+        segments = list(self.transcript_segments)
+
         # Prepare transcript data
         transcript_data = {
             "session_id": self.session_id,
@@ -216,110 +252,150 @@ class TeamsMultilingualTranscriber:
             "end_time": datetime.now(UTC).isoformat(),
             "language_setting": self.language,
             "source": "teams_meeting",
-            "segments": self.transcript_segments,
-            "total_segments": len(self.transcript_segments),
+            "segments": segments,
+            "total_segments": self.segment_counter,
             "total_speakers": self.speaker_counter,
-            "languages_detected": list(set([
-                seg.get("detected_language", "unknown")
-                for seg in self.transcript_segments
-            ]))
+            "languages_detected": list(self._languages_detected)
         }
 
-        # JSON file
+        # Disk writes run in worker threads so the event loop keeps serving callbacks
         json_filename = f"{prefix}.json"
-        with open(json_filename, 'w', encoding='utf-8') as f:
-            json.dump(transcript_data, f, indent=2, ensure_ascii=False)
+        await asyncio.to_thread(self._write_json_sync, json_filename, transcript_data)
 
-        # TXT file
         txt_filename = f"{prefix}.txt"
-        with open(txt_filename, 'w', encoding='utf-8') as f:
-            f.write(f"TEAMS MULTILINGUAL TRANSCRIPT - {self.session_id}\n")
-            f.write(f"Language Setting: {self.language}\n")
-            f.write(f"Languages Detected: {', '.join(transcript_data['languages_detected'])}\n")
-            f.write(f"Started: {self.session_start.isoformat()}\n")
-            f.write("=" * 60 + "\n\n")
-
-            for segment in self.transcript_segments:
-                timestamp = segment["start_time"][11:19]
-                lang_flag = self.get_language_flag(segment["detected_language"])
-                f.write(f"[{timestamp}] {lang_flag} {segment['speaker_id']}: {segment['text']}\n")
-
-            f.write(f"\n" + "=" * 60)
-            f.write(f"\nSummary: {transcript_data['total_segments']} segments, ")
-            f.write(f"{transcript_data['total_speakers']} speakers\n")
-            f.write(f"Languages: {', '.join(transcript_data['languages_detected'])}")
+        await asyncio.to_thread(self._write_txt_sync, txt_filename, transcript_data, segments)
 
         # Save audio file if available
         audio_filename = None
-        if self.audio_recording and self.audio_frames:
+        if self.audio_recording and self.audio_filename:
             audio_filename = f"{prefix}.wav"
-            self._save_audio_file(audio_filename)
+            await asyncio.to_thread(self._save_audio_file, audio_filename)
 
         return json_filename, txt_filename, audio_filename
 
+    @staticmethod
+    def _write_json_sync(filename: str, transcript_data: Dict[str, Any]) -> None:
+        """Write the JSON transcript (blocking)."""
+        # orjson serializes Segment dataclasses natively and emits UTF-8 directly
+        data = orjson.dumps(transcript_data, option=orjson.OPT_INDENT_2)
+        with open(filename, 'wb') as f:
+            f.write(data)
+
+    def _write_txt_sync(
+        self, filename: str, transcript_data: Dict[str, Any], segments: List[Segment]
+    ) -> None:
+        """Write the human-readable TXT transcript (blocking)."""
+        languages = ', '.join(transcript_data['languages_detected'])
+        flags = self.LANGUAGE_FLAGS
+        header = (
+            f"TEAMS MULTILINGUAL TRANSCRIPT - {self.session_id}\n"
+            f"Language Setting: {self.language}\n"
+            f"Languages Detected: {languages}\n"
+            f"Started: {self.session_start.isoformat()}\n"
+            + "=" * 60 + "\n\n"
+        )
+        lines = "".join([
+            f"[{seg.start_time[11:19]}] {flags.get(seg.detected_language, '🌍')} "
+            f"{seg.speaker_id}: {seg.text}\n"
+            for seg in segments
+        ])
+        footer = (
+            "\n" + "=" * 60
+            + f"\nSummary: {transcript_data['total_segments']} segments, "
+            f"{transcript_data['total_speakers']} speakers\n"
+            f"Languages: {languages}"
+        )
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(header)
+            f.write(lines)
+            f.write(footer)
+
     def _start_audio_recording(self) -> None:
         """Start recording audio for corroboration."""
         if not PYAUDIO_AVAILABLE:
             return
 
         try:
-            self.audio_frames = []
+            # Open the WAV file up front; frames are appended as they are captured
+            self.audio_filename = f"teams_transcript_{self.session_id}.wav"
+            self._wave_file = wave.open(self.audio_filename, 'wb')
+            self._wave_file.setnchannels(self.audio_channels)
+            self._wave_file.setsampwidth(self.audio_sample_width)
+            self._wave_file.setframerate(self.audio_rate)
             self.recording_active = True
 
             # Initialize PyAudio
-            audio = pyaudio.PyAudio()
+            self._pyaudio = pyaudio.PyAudio()
 
-            # Create audio stream
-            self.audio_stream = audio.open(
+            # Create audio stream; PortAudio delivers frames to the callback on its own thread
+            self.audio_stream = self._pyaudio.open(
                 format=self.audio_format,
                 channels=self.audio_channels,
                 rate=self.audio_rate,
                 input=True,
-                frames_per_buffer=self.audio_chunk
+                frames_per_buffer=self.audio_chunk,
+                stream_callback=self._on_audio_frames
             )
 
-            # Start recording thread
-            self.audio_thread = threading.Thread(target=self._record_audio)
-            self.audio_thread.start()
-
         except Exception as e:
             print(f"Warning: Could not start audio recording: {e}")
             self.audio_recording = False
-
-    def _record_audio(self) -> None:
-        """Record audio in a separate thread."""
-        while self.recording_active:
-            try:
-                data = self.audio_stream.read(self.audio_chunk, exception_on_overflow=False)
-                self.audio_frames.append(data)
-            except Exception:
-                break
+            self.recording_active = False
+            if self._pyaudio:
+                self._pyaudio.terminate()
+                self._pyaudio = None
+
+            # Don't leave an empty WAV behind for save_transcript_files to report
+            self._close_wave_file()
+            if self.audio_filename:
+                try:
+                    os.remove(self.audio_filename)
+                except FileNotFoundError:
+                    pass
+                self.audio_filename = None
+
+    def _on_audio_frames(self, in_data, frame_count, time_info, status):
+        """PyAudio stream callback: append captured frames to the WAV file."""
+        with self._wave_lock:
+            if not self._wave_file:
+                return (None, pyaudio.paComplete)
+            self._wave_file.writeframesraw(in_data)
+        return (None, pyaudio.paContinue)
 
     def _stop_audio_recording(self) -> None:
         """Stop audio recording."""
         if self.recording_active:
             self.recording_active = False
 
-            if self.audio_thread and self.audio_thread.is_alive():
-                self.audio_thread.join(timeout=1.0)
-
             if self.audio_stream:
                 self.audio_stream.stop_stream()
                 self.audio_stream.close()
+                self.audio_stream = None
 
-    def _save_audio_file(self, filename: str) -> None:
-        """Save recorded audio to WAV file."""
-        if not PYAUDIO_AVAILABLE:
-            return
+            if self._pyaudio:
+                self._pyaudio.terminate()
+                self._pyaudio = None
+
+            self._close_wave_file()
 
+    def _close_wave_file(self) -> None:
+        """Finalize the WAV header and close the recording file."""
+        with self._wave_lock:
+            if self._wave_file:
+                self._wave_file.close()
+                self._wave_file = None
+
+    def _save_audio_file(self, filename: str) -> None:
+        """Move the recorded WAV file to its final name."""
         try:
-            with wave.open(filename, 'wb') as wf:
-                wf.setnchannels(self.audio_channels)
-                wf.setsampwidth(pyaudio.get_sample_size(self.audio_format))
-                wf.setframerate(self.audio_rate)
-                wf.writeframes(b''.join(self.audio_frames))
+            # Make sure the header is finalized even if recording was not stopped
+            self._close_wave_file()
+            if filename != self.audio_filename:
+                os.replace(self.audio_filename, filename)
+                self.audio_filename = filename
 
             print(f"🎵 Audio saved: {filename}")
 
         except Exception as e:
-            print(f"Warning: Could not save audio file: {e}")
\ No newline at end of file
+            print(f"Warning: Could not save audio file: {e}")
@@ -16,12 +16,13 @@ def test_auth():
 
         # Test Graph API call
         print("\n📊 Testing Graph API call...")
-        headers = client.get_headers()
+        session = requests.Session()
+        session.headers.update(client.get_headers())
 
         # Simple Graph API call to get service principal info
-        response = requests.get(
-            f"https://graph.microsoft.com/v1.0/servicePrincipals?$filter=appId eq '{client.client_id}'",
-            headers=headers
+        response = session.get(
+            "https://graph.microsoft.com/v1.0/servicePrincipals"
+            f"?$filter=appId eq '{client.client_id}'"
         )
 
         if response.status_code == 200:
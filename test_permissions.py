@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 from src.auth.msal_client import MSALAuthClient
 import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 # Load environment variables
 load_dotenv()
@@ -30,11 +31,12 @@ def test_permissions():
         print(f"❌ Authentication failed: {e}")
         return False
 
-    # Headers for Graph API calls
-    headers = {
+    # One keep-alive session for every Graph API call
+    session = requests.Session()
+    session.headers.update({
         'Authorization': f'Bearer {token}',
         'Content-Type': 'application/json'
-    }
+    })
 
     # Get the application's service principal to check permissions
     app_id = os.getenv("BOT_APP_ID")
@@ -43,7 +45,7 @@ def test_permissions():
     print("📋 Checking Service Principal and Permissions:")
     print("-" * 60)
 
-    response = requests.get(sp_url, headers=headers)
+    response = session.get(sp_url)
     if response.status_code == 200:
         data = response.json()
         if data.get('value'):
@@ -55,7 +57,7 @@ def test_permissions():
             sp_id = sp.get('id')
             roles_url = f"https://graph.microsoft.com/v1.0/servicePrincipals/{sp_id}/appRoleAssignments"
 
-            roles_response = requests.get(roles_url, headers=headers)
+            roles_response = session.get(roles_url)
             if roles_response.status_code == 200:
                 roles_data = roles_response.json()
                 app_roles = roles_data.get('value', [])
@@ -66,7 +68,7 @@ def test_permissions():
                         # Get the resource service principal to get permission names
                         resource_sp_id = role.get('resourceId')
                         resource_url = f"https://graph.microsoft.com/v1.0/servicePrincipals/{resource_sp_id}"
-                        resource_response = requests.get(resource_url, headers=headers)
+                        resource_response = session.get(resource_url)
                         if resource_response.status_code == 200:
                             resource_data = resource_response.json()
                             # Find the permission name
@@ -90,41 +92,50 @@ def test_permissions():
     permissions_to_test = [
         {
             "name": "User.Read.All",
-            "test": lambda h: requests.get("https://graph.microsoft.com/v1.0/users?$top=1", headers=h),
+            "test": lambda s: s.get("https://graph.microsoft.com/v1.0/users?$top=1"),
             "description": "Read user profiles"
         },
         {
             "name": "OnlineMeetings.ReadWrite.All",
-            "test": lambda h: requests.get("https://graph.microsoft.com/v1.0/me/onlineMeetings", headers=h),
+            "test": lambda s: s.get("https://graph.microsoft.com/v1.0/me/onlineMeetings"),
             "description": "Access online meetings"
         },
         {
             "name": "Calls.AccessMedia.All",
-            "test": lambda h: requests.get("https://graph.microsoft.com/v1.0/communications/calls", headers=h),
+            "test": lambda s: s.get("https://graph.microsoft.com/v1.0/communications/calls"),
             "description": "Access call media"
         }
     ]
 
+    def run_probe(perm):
+        """Run one probe, capturing any error for ordered reporting."""
+        try:
+            return perm, perm['test'](session), None
+        except Exception as e:
+            return perm, None, e
+
+    # The probes are independent, so issue them concurrently and report in order
+    with ThreadPoolExecutor(max_workers=len(permissions_to_test)) as executor:
+        results = list(executor.map(run_probe, permissions_to_test))
+
     all_passed = True
-    for perm in permissions_to_test:
+    for perm, response, error in results:
         print(f"\n📌 Testing {perm['name']}:")
         print(f"   Purpose: {perm['description']}")
-        try:
-            response = perm['test'](headers)
-            if response.status_code in [200, 404, 400]:  # 404/400 might be OK if no data exists
-                print(f"   ✅ Permission appears to be granted (status: {response.status_code})")
-            elif response.status_code == 403:
-                print(f"   ❌ Permission DENIED - needs admin consent or not granted")
-                all_passed = False
-            elif response.status_code == 401:
-                print(f"   ❌ Authentication failed")
-                all_passed = False
-            else:
-                print(f"   ⚠️  Unexpected status: {response.status_code}")
-                print(f"       Response: {response.text[:200]}")
-        except Exception as e:
-            print(f"   ❌ Test failed with error: {e}")
+        if error:
+            print(f"   ❌ Test failed with error: {error}")
+            all_passed = False
+        elif response.status_code in [200, 404, 400]:  # 404/400 might be OK if no data exists
+            print(f"   ✅ Permission appears to be granted (status: {response.status_code})")
+        elif response.status_code == 403:
+            print(f"   ❌ Permission DENIED - needs admin consent or not granted")
+            all_passed = False
+        elif response.status_code == 401:
+            print(f"   ❌ Authentication failed")
             all_passed = False
+        else:
+            print(f"   ⚠️  Unexpected status: {response.status_code}")
+            print(f"       Response: {response.text[:200]}")
 
     print("\n" + "=" * 60)
     print("📊 SUMMARY:")
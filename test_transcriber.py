@@ -4,11 +4,7 @@ import asyncio
 import sys
 import os
 from datetime import datetime
-
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
-
-from transcription.azure_speech_transcriber import AzureSpeechTranscriber
+from src.transcription.azure_speech_transcriber import AzureSpeechTranscriber
 
 
 async def test_microphone_transcription():
@@ -0,0 +1,49 @@
+"""
+Expected project layout shared by the structure tests and their fixtures
+"""
+
+# Subpackages every src layout must provide
+REQUIRED_MODULES = ("bot", "audio", "transcription", "graph_api", "storage", "teams", "monitoring")
+
+REQUIRED_ROOT_FILES = (
+    "README.md",
+    "requirements.txt",
+    "requirements-dev.txt",
+    "setup.py",
+    "pyproject.toml",
+    ".gitignore",
+    ".env.example",
+    "CLAUDE.md",
+)
+
+REQUIRED_TEST_SUBDIRS = ("unit", "integration")
+
+# Essential runtime dependencies from the issue requirements
+REQUIRED_PACKAGES = (
+    "botbuilder-core",
+    "botbuilder-schema",
+    "msal",
+    "azure-cognitiveservices-speech",
+    "azure-storage-blob",
+    "aiohttp",
+    "python-dotenv",
+    "pytest",
+)
+
+REQUIRED_DEV_PACKAGES = (
+    "pytest",
+    "pytest-asyncio",
+    "pytest-cov",
+    "black",
+    "flake8",
+    "mypy",
+)
+
+# Python-specific patterns .gitignore must cover
+PY_IGNORES = (
+    "__pycache__",
+    "*.pyc",
+    ".env",
+    "venv",
+    ".pytest_cache",
+)
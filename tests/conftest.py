@@ -1,9 +1,235 @@
 """
 Pytest configuration and fixtures
 """
+import asyncio
+import hashlib
+import importlib.util
+import os
+import re
+import shutil
 import sys
+import tomllib
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
-# Add project root to path
-PROJECT_ROOT = Path(__file__).parent.parent
-sys.path.insert(0, str(PROJECT_ROOT))
\ No newline at end of file
+import pytest
+
+from tests._structure_config import REQUIRED_MODULES
+
+# CI checkouts are throwaway; don't spend I/O writing bytecode or rewritten-assert caches
+if os.environ.get("CI"):
+    sys.dont_write_bytecode = True
+
+# Project root and src are put on sys.path by the pytest `pythonpath` setting in pyproject.toml
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+TERRAFORM_DIR = PROJECT_ROOT / "terraform"
+
+# Run async tests on uvloop where it is available
+if sys.platform != "win32":
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
+# The infrastructure tests call live Azure resources; skip collecting them without credentials.
+# .env is only read here, never loaded into os.environ, so unit tests don't see real secrets.
+AZURE_ENV_VARS = (
+    "AZURE_TENANT_ID",
+    "AZURE_CLIENT_ID",
+    "AZURE_CLIENT_SECRET",
+    "AZURE_SUBSCRIPTION_ID",
+)
+
+
+def _has_azure_credentials() -> bool:
+    """Whether every AZURE_ENV_VARS value is set in the environment or in .env."""
+    if all(os.getenv(name) for name in AZURE_ENV_VARS):
+        return True
+    from dotenv import dotenv_values
+
+    dotenv = dotenv_values(PROJECT_ROOT / ".env")
+    return all(os.getenv(name) or dotenv.get(name) for name in AZURE_ENV_VARS)
+
+
+if not _has_azure_credentials():
+    collect_ignore = ["integration/test_azure_infrastructure.py"]
+
+
+# Small config files whose contents several structure tests inspect
+CONFIG_FILES = (
+    "README.md",
+    "requirements.txt",
+    "requirements-dev.txt",
+    "pyproject.toml",
+    ".gitignore",
+    "setup.py",
+    "terraform/main.tf",
+)
+
+
+@lru_cache(maxsize=64)
+def _read_cached(path_str: str, mtime_ns: int) -> str:
+    return Path(path_str).read_text()
+
+
+def read_text(path: Path) -> str:
+    """Contents of path, cached until its mtime changes."""
+    return _read_cached(str(path), os.stat(path).st_mtime_ns)
+
+
+@lru_cache(maxsize=1)
+def _walk_project() -> tuple:
+    """(all paths, directory paths) relative to PROJECT_ROOT, from one scandir walk."""
+    paths, dirs = set(), set()
+    pending = [Path()]
+    while pending:
+        rel_dir = pending.pop()
+        with os.scandir(PROJECT_ROOT / rel_dir) as entries:
+            for entry in entries:
+                rel_path = rel_dir / entry.name
+                # Directory type comes from the dirent; no extra stat per entry
+                if entry.is_dir(follow_symlinks=False):
+                    # Skip VCS metadata, caches and other hidden directories
+                    if entry.name.startswith(".") or entry.name == "__pycache__":
+                        continue
+                    dirs.add(rel_path)
+                    pending.append(rel_path)
+                paths.add(rel_path)
+    return frozenset(paths), frozenset(dirs)
+
+
+@pytest.fixture(scope="session")
+def project_tree() -> frozenset:
+    """Relative paths of every file and directory in the project, walked once."""
+    return _walk_project()[0]
+
+
+@pytest.fixture(scope="session")
+def project_dirs() -> frozenset:
+    """Relative paths of every directory in the project, from the same walk."""
+    return _walk_project()[1]
+
+
+@pytest.fixture(scope="session")
+def project_files() -> dict:
+    """Contents of the config files in CONFIG_FILES that exist, read once."""
+    files = {}
+    for name in CONFIG_FILES:
+        path = PROJECT_ROOT / name
+        if path.is_file():
+            files[name] = read_text(path)
+    return files
+
+
+@pytest.fixture(scope="session")
+def pyproject(project_files) -> dict:
+    """Parsed pyproject.toml, or an empty dict if the file is missing."""
+    if "pyproject.toml" not in project_files:
+        return {}
+    return tomllib.loads(project_files["pyproject.toml"])
+
+
+@pytest.fixture(scope="session", params=REQUIRED_MODULES)
+def src_submodule_spec(request):
+    """Import spec of each required src subpackage, resolved without executing it."""
+    return importlib.util.find_spec(f"src.{request.param}")
+
+
+def _terraform_main_tf() -> str:
+    """Contents of terraform/main.tf, re-read only when it changes."""
+    return read_text(TERRAFORM_DIR / "main.tf")
+
+
+# Block declarations plus the name references the naming-convention test looks for
+_TF_RE = re.compile(
+    r'\b(?P<kind>resource|output|variable)\s+"(?P<name>[^"]+)"'
+    r'|(?P<ref>var\.[a-z_]+|rg-|resource_group_name)'
+)
+
+
+@dataclass(frozen=True)
+class MainTfIndex:
+    """Block names and references found in terraform/main.tf, plus its raw text."""
+
+    resources: frozenset
+    outputs: frozenset
+    variables: frozenset
+    refs: frozenset
+    raw: str
+
+
+@pytest.fixture(scope="session")
+def main_tf_index() -> MainTfIndex:
+    """Index of terraform/main.tf, built in one regex pass and shared by all terraform tests."""
+    text = _terraform_main_tf()
+    blocks = {"resource": set(), "output": set(), "variable": set()}
+    refs = set()
+    for match in _TF_RE.finditer(text):
+        if match["kind"]:
+            blocks[match["kind"]].add(match["name"])
+        else:
+            refs.add(match["ref"])
+    return MainTfIndex(
+        resources=frozenset(blocks["resource"]),
+        outputs=frozenset(blocks["output"]),
+        variables=frozenset(blocks["variable"]),
+        refs=frozenset(refs),
+        raw=text
+    )
+
+
+@pytest.fixture(scope="session")
+def terraform_bin() -> str:
+    """Absolute path of the terraform binary; skips dependent tests if it is not installed."""
+    path = shutil.which("terraform")
+    if not path:
+        pytest.skip("terraform not installed")
+    return path
+
+
+@pytest.fixture(scope="session")
+def terraform_ready(terraform_bin) -> tuple:
+    """Run `terraform init` once per session and return (returncode, stderr)."""
+    import subprocess
+
+    result = subprocess.run(
+        [terraform_bin, "init", "-backend=false"],
+        cwd=TERRAFORM_DIR,
+        capture_output=True,
+        text=True,
+        check=False
+    )
+    return result.returncode, result.stderr
+
+
+@pytest.fixture(scope="session")
+def tf_tree_hash() -> str:
+    """Digest of the path, mtime and size of every .tf file under terraform/."""
+    digest = hashlib.blake2b(digest_size=16)
+    for dirpath, dirnames, filenames in os.walk(TERRAFORM_DIR):
+        # Provider plugins downloaded by `terraform init` are not formatted sources
+        dirnames[:] = sorted(name for name in dirnames if name != ".terraform")
+        for name in sorted(filenames):
+            if not name.endswith(".tf"):
+                continue
+            path = os.path.join(dirpath, name)
+            st = os.stat(path)
+            digest.update(path.encode())
+            digest.update(st.st_mtime_ns.to_bytes(8, "little"))
+            digest.update(st.st_size.to_bytes(8, "little"))
+    return digest.hexdigest()
+
+
+@pytest.fixture(scope="session")
+def http():
+    """Keep-alive HTTP session shared by the integration probes."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    yield session
+    session.close()
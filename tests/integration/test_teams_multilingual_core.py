@@ -2,9 +2,31 @@
 """Test script to simulate Teams bot with multilingual transcription."""
 import asyncio
 import os
+from collections import deque
+import pytest
 from datetime import datetime
+from src.transcription.segment import Segment
 from src.transcription.teams_multilingual_transcriber import TeamsMultilingualTranscriber
 
+# Emoji flag per detected language
+FLAGS = {
+    "es-ES": "🇪🇸",
+    "de-DE": "🇩🇪",
+    "en-US": "🇺🇸",
+    "unknown": "🌍"
+}
+
+# Cap on transcript entries kept in memory; the oldest are dropped first
+MAX_TRANSCRIPT_ENTRIES = 10_000
+
+# FAST_TEST=1 skips the live audio wait and feeds canned segments instead
+WAIT_SECS = 0 if os.getenv("FAST_TEST") == "1" else 30
+MOCK_SEGMENTS = [
+    ("es-ES", "Hola, ¿cómo estás?"),
+    ("de-DE", "Guten Tag zusammen."),
+    ("en-US", "Let's get started."),
+]
+
 
 class MockTurnContext:
     """Mock TurnContext for testing Teams bot functionality."""
@@ -25,7 +47,9 @@ class MockTeamsBotTest:
     def __init__(self):
         self.active_call = None
         self.transcriber = None
-        self.transcript_entries = []
+        self.transcript_entries = deque(maxlen=MAX_TRANSCRIPT_ENTRIES)
+        self._languages_seen = set()
+        self._segments_ready = asyncio.Event()
 
     async def test_join_call(self, turn_context: MockTurnContext):
         """Simulate joining a Teams call."""
@@ -66,9 +90,18 @@ class MockTeamsBotTest:
         try:
             # Stop transcription and save files
             session_summary = {}
+            saved_files = []
+            audio_file = None
             if self.transcriber:
                 session_summary = await self.transcriber.stop_transcription()
-                json_file, txt_file = await self.transcriber.save_transcript_files()
+                result = await self.transcriber.save_transcript_files()
+                if result and len(result) >= 2:
+                    json_file, txt_file = result[0], result[1]
+                    saved_files = [txt_file, json_file]
+                    # Check if audio file was also saved
+                    audio_file = result[2] if len(result) > 2 else None
+                    if audio_file:
+                        saved_files.append(audio_file)
                 self.transcriber = None
 
             # Prepare transcript summary
@@ -76,14 +109,22 @@ class MockTeamsBotTest:
             total_speakers = session_summary.get('total_speakers', 0)
             languages = session_summary.get('languages_detected', [])
 
+            # Include file information in summary
+            files_info = (
+                f"📄 Files saved: {len(saved_files)} files" if saved_files else "No files saved"
+            )
+            audio_info = " (🎵 includes audio)" if audio_file else ""
+
             transcript_summary = (
                 f"📝 Transcript saved: {total_segments} segments, {total_speakers} speakers\\n"
-                f"🌍 Languages detected: {', '.join(languages) if languages else 'None'}"
+                f"🌍 Languages detected: {', '.join(languages) if languages else 'None'}\\n"
+                f"{files_info}{audio_info}"
             )
 
             # Clear state
             self.active_call = None
-            self.transcript_entries = []
+            self.transcript_entries.clear()
+            self._languages_seen.clear()
 
             await turn_context.send_activity(
                 f"✅ Left call. {transcript_summary}"
@@ -103,10 +144,7 @@ class MockTeamsBotTest:
             if self.transcriber and hasattr(self.transcriber, 'transcript_segments'):
                 segments_count = len(self.transcriber.transcript_segments)
                 speakers_count = self.transcriber.speaker_counter
-                languages = list(set([
-                    seg.get("detected_language", "unknown")
-                    for seg in self.transcriber.transcript_segments
-                ]))
+                languages = list(self._languages_seen)
 
             status = (
                 f"📞 In call since: {self.active_call['joined_at']}\\n"
@@ -119,31 +157,27 @@ class MockTeamsBotTest:
 
         await turn_context.send_activity(status)
 
-    async def on_transcription_received(self, transcription_result):
+    async def on_transcription_received(self, segment):
         """Handle transcription results with speaker diarization."""
         # Store transcription with speaker identification
-        self.transcript_entries.append(transcription_result)
+        self.transcript_entries.append(segment)
+        self._languages_seen.add(segment.detected_language)
+        self._segments_ready.set()
 
         # Display transcription with language flag
-        lang_flag = self.get_language_flag(transcription_result.get('detected_language', 'unknown'))
-        speaker_id = transcription_result.get('speaker_id', 'Unknown')
-        text = transcription_result.get('text', '')
-
-        print(f"📝 {lang_flag} [{speaker_id}]: {text}")
+        lang_flag = FLAGS.get(segment.detected_language, "🌍")
 
-    def get_language_flag(self, language_code: str) -> str:
-        """Get emoji flag for language."""
-        flags = {
-            "es-ES": "🇪🇸",
-            "de-DE": "🇩🇪",
-            "en-US": "🇺🇸",
-            "unknown": "🌍"
-        }
-        return flags.get(language_code, "🌍")
+        print(f"📝 {lang_flag} [{segment.speaker_id}]: {segment.text}")
 
 
+@pytest.mark.slow
 async def test_teams_bot_multilingual():
-    """Test the Teams bot multilingual functionality."""
+    """Test the Teams bot multilingual functionality.
+
+    By default waits up to 30 seconds for live speech from the microphone.
+    With FAST_TEST=1 the wait is skipped and MOCK_SEGMENTS are fed to the
+    transcription handler instead, for quick local iterations.
+    """
     print("🌍 Testing Teams Bot with Multilingual Transcription")
     print("=" * 60)
 
@@ -163,15 +197,36 @@ async def test_teams_bot_multilingual():
     await bot.test_status(context)
 
     # Test 4: Wait for transcription (simulate meeting audio)
-    print("\\n🎤 Test 4: Waiting for Audio Input (30 seconds)")
-    print("🗣️  Speak in Spanish, German, or English to test multilingual detection!")
-    print("📺 Your Spanish YouTube video should work perfectly now!")
-
-    # Wait for audio input and transcription
-    for i in range(30):
-        await asyncio.sleep(1)
-        if i % 10 == 0 and i > 0:
-            print(f"⏰ {30-i} seconds remaining...")
+    if WAIT_SECS == 0:
+        print("\\n🎤 Test 4: Feeding mock segments (FAST_TEST=1)")
+        for segment_id, (language, text) in enumerate(MOCK_SEGMENTS, 1):
+            await bot.on_transcription_received(Segment(
+                segment_id=segment_id,
+                speaker_id=f"Speaker_{segment_id}",
+                text=text,
+                start_time=datetime.utcnow().isoformat(),
+                confidence=0.95,
+                detected_language=language
+            ))
+    else:
+        print(f"\\n🎤 Test 4: Waiting for Audio Input ({WAIT_SECS} seconds)")
+        print("🗣️  Speak in Spanish, German, or English to test multilingual detection!")
+        print("📺 Your Spanish YouTube video should work perfectly now!")
+
+        async def countdown():
+            for i in range(WAIT_SECS):
+                await asyncio.sleep(1)
+                if i % 10 == 0 and i > 0:
+                    print(f"⏰ {WAIT_SECS-i} seconds remaining...")
+
+        # Wait until the first transcription arrives, up to WAIT_SECS
+        countdown_task = asyncio.create_task(countdown())
+        try:
+            await asyncio.wait_for(bot._segments_ready.wait(), timeout=WAIT_SECS)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            countdown_task.cancel()
 
     # Test 5: Check status after transcription
     print("\\n🔍 Test 5: Status After Transcription")
@@ -1,25 +1,57 @@
 """Test authentication functionality."""
+import asyncio
 import os
+import sys
+import time
 import pytest
 from unittest.mock import Mock, patch
-from src.auth.msal_client import MSALAuthClient
+from src.auth.msal_client import MSALAuthClient, _load_token_cache, _save_token_cache
+
+TEST_ENV = {
+    "BOT_APP_ID": "test-client-id",
+    "BOT_APP_PASSWORD": "test-secret",
+    "AZURE_TENANT_ID": "test-tenant-id"
+}
+
+
+@pytest.fixture(scope="module")
+def mocked_msal_client():
+    """One MSALAuthClient over a mocked MSAL app, shared by every test in the module."""
+    with pytest.MonkeyPatch.context() as mp, \
+            patch("src.auth.msal_client.msal.ConfidentialClientApplication", return_value=Mock()):
+        for name, value in TEST_ENV.items():
+            mp.setenv(name, value)
+        # Don't inherit an app pooled by another module, or leak this mocked one
+        MSALAuthClient._apps.clear()
+        client = MSALAuthClient()
+        yield client
+        client.close()
+        MSALAuthClient._apps.clear()
+
+
+@pytest.fixture
+def mock_app(mocked_msal_client):
+    """The shared client's MSAL app, with call tracking, responses and memoized tokens reset."""
+    mocked_msal_client.close()
+    mocked_msal_client._tokens.clear()
+    mocked_msal_client._refresh_at.clear()
+    mocked_msal_client._headers_token = None
+    mocked_msal_client.app.reset_mock(return_value=True, side_effect=True)
+    return mocked_msal_client.app
 
 
 class TestMSALAuthClient:
     """Test MSAL authentication client."""
 
-    def test_init_success(self):
-        """Test successful initialization with real Azure credentials."""
-        # Load real credentials from .env file
-        from dotenv import load_dotenv
-        load_dotenv()
-
-        # Test with real credentials
-        client = MSALAuthClient()
-        assert client.client_id == os.getenv("BOT_APP_ID")
-        assert client.client_secret == os.getenv("BOT_APP_PASSWORD")
-        assert client.tenant_id == os.getenv("AZURE_TENANT_ID")
-        assert client.authority == f"https://login.microsoftonline.com/{os.getenv('AZURE_TENANT_ID')}"
+    def test_init_success(self, mocked_msal_client):
+        """Test successful initialization from environment variables."""
+        client = mocked_msal_client
+        assert client.client_id == TEST_ENV["BOT_APP_ID"]
+        assert client.client_secret == TEST_ENV["BOT_APP_PASSWORD"]
+        assert client.tenant_id == TEST_ENV["AZURE_TENANT_ID"]
+        assert (
+            client.authority == f"https://login.microsoftonline.com/{TEST_ENV['AZURE_TENANT_ID']}"
+        )
         assert client.app is not None  # Verify MSAL app was created successfully
 
     @patch.dict("os.environ", {}, clear=True)
@@ -28,97 +60,204 @@ class TestMSALAuthClient:
         with pytest.raises(ValueError, match="Missing required environment variables"):
             MSALAuthClient()
 
-    @patch.dict("os.environ", {
-        "BOT_APP_ID": "test-client-id",
-        "BOT_APP_PASSWORD": "test-secret",
-        "AZURE_TENANT_ID": "test-tenant-id"
-    })
-    @patch("src.auth.msal_client.msal.ConfidentialClientApplication")
-    def test_get_token_success(self, mock_msal):
+    def test_get_token_success(self, mocked_msal_client, mock_app):
         """Test successful token acquisition."""
         # Mock MSAL response
-        mock_app = Mock()
         mock_app.acquire_token_silent.return_value = None
         mock_app.acquire_token_for_client.return_value = {
             "access_token": "test-token",
             "expires_in": 3600
         }
-        mock_msal.return_value = mock_app
 
-        client = MSALAuthClient()
-        token = client.get_token()
+        token = mocked_msal_client.get_token()
 
         assert token == "test-token"
         mock_app.acquire_token_for_client.assert_called_once_with(
             scopes=["https://graph.microsoft.com/.default"]
         )
 
-    @patch.dict("os.environ", {
-        "BOT_APP_ID": "test-client-id",
-        "BOT_APP_PASSWORD": "test-secret",
-        "AZURE_TENANT_ID": "test-tenant-id"
-    })
-    @patch("src.auth.msal_client.msal.ConfidentialClientApplication")
-    def test_get_token_from_cache(self, mock_msal):
+    def test_get_token_from_cache(self, mocked_msal_client, mock_app):
         """Test token retrieval from cache."""
         # Mock MSAL response
-        mock_app = Mock()
         mock_app.acquire_token_silent.return_value = {
             "access_token": "cached-token",
             "expires_in": 3600
         }
-        mock_msal.return_value = mock_app
 
-        client = MSALAuthClient()
-        token = client.get_token()
+        token = mocked_msal_client.get_token()
 
         assert token == "cached-token"
         mock_app.acquire_token_for_client.assert_not_called()
 
-    @patch.dict("os.environ", {
-        "BOT_APP_ID": "test-client-id",
-        "BOT_APP_PASSWORD": "test-secret",
-        "AZURE_TENANT_ID": "test-tenant-id"
-    })
-    @patch("src.auth.msal_client.msal.ConfidentialClientApplication")
-    def test_get_token_failure(self, mock_msal):
+    def test_get_token_failure(self, mocked_msal_client, mock_app):
         """Test token acquisition failure."""
         # Mock MSAL error response
-        mock_app = Mock()
         mock_app.acquire_token_silent.return_value = None
         mock_app.acquire_token_for_client.return_value = {
             "error": "invalid_client",
             "error_description": "Invalid client credentials"
         }
-        mock_msal.return_value = mock_app
-
-        client = MSALAuthClient()
 
         with pytest.raises(Exception, match="Failed to get token: Invalid client credentials"):
-            client.get_token()
-
-    @patch.dict("os.environ", {
-        "BOT_APP_ID": "test-client-id",
-        "BOT_APP_PASSWORD": "test-secret",
-        "AZURE_TENANT_ID": "test-tenant-id"
-    })
-    @patch("src.auth.msal_client.msal.ConfidentialClientApplication")
-    def test_get_headers(self, mock_msal):
+            mocked_msal_client.get_token()
+
+    def test_get_headers(self, mocked_msal_client, mock_app):
         """Test getting authorization headers."""
         # Mock MSAL response
-        mock_app = Mock()
         mock_app.acquire_token_silent.return_value = None
         mock_app.acquire_token_for_client.return_value = {
             "access_token": "test-token",
             "expires_in": 3600
         }
-        mock_msal.return_value = mock_app
 
-        client = MSALAuthClient()
-        headers = client.get_headers()
+        headers = mocked_msal_client.get_headers()
 
         expected_headers = {
             "Authorization": "Bearer test-token",
             "Content-Type": "application/json"
         }
-        assert headers == expected_headers
\ No newline at end of file
+        assert headers == expected_headers
+
+    def test_get_token_memoized(self, mocked_msal_client, mock_app):
+        """Test repeated calls reuse the memoized token without asking MSAL again."""
+        mock_app.acquire_token_silent.return_value = None
+        mock_app.acquire_token_for_client.return_value = {
+            "access_token": "test-token",
+            "expires_in": 3600
+        }
+
+        assert mocked_msal_client.get_token() == "test-token"
+        assert mocked_msal_client.get_token() == "test-token"
+        mock_app.acquire_token_silent.assert_called_once()
+        mock_app.acquire_token_for_client.assert_called_once()
+
+    async def test_get_token_async_starts_background_refresh(self, mocked_msal_client, mock_app):
+        """Test async token requests start one refresh task and the sync path starts none."""
+        mock_app.acquire_token_silent.return_value = None
+        mock_app.acquire_token_for_client.return_value = {
+            "access_token": "test-token",
+            "expires_in": 3600
+        }
+
+        mocked_msal_client.get_token()
+        assert mocked_msal_client._refresh_task is None
+
+        await mocked_msal_client.get_token_async()
+        refresh_task = mocked_msal_client._refresh_task
+        await mocked_msal_client.get_token_async()
+
+        assert refresh_task is not None
+        assert mocked_msal_client._refresh_task is refresh_task
+
+        mocked_msal_client.close()
+        assert mocked_msal_client._refresh_task is None
+
+    def test_background_refresh_restarts_on_new_loop(self, mocked_msal_client, mock_app):
+        """Test a refresh task left behind by a closed loop is replaced on the next loop."""
+        mock_app.acquire_token_silent.return_value = None
+        mock_app.acquire_token_for_client.return_value = {
+            "access_token": "test-token",
+            "expires_in": 3600
+        }
+
+        async def fetch():
+            await mocked_msal_client.get_token_async()
+            return mocked_msal_client._refresh_task
+
+        first = asyncio.run(fetch())
+        second = asyncio.run(fetch())
+        mocked_msal_client.close()
+
+        assert first is not second
+
+    async def test_get_token_async_single_flight(self, mocked_msal_client, mock_app):
+        """Test concurrent async token requests share one MSAL lookup."""
+        mock_app.acquire_token_silent.return_value = None
+        mock_app.acquire_token_for_client.return_value = {
+            "access_token": "test-token",
+            "expires_in": 3600
+        }
+
+        tokens = await asyncio.gather(*(mocked_msal_client.get_token_async() for _ in range(5)))
+        mocked_msal_client.close()
+
+        assert tokens == ["test-token"] * 5
+        mock_app.acquire_token_for_client.assert_called_once()
+
+    def test_get_headers_reused(self, mocked_msal_client, mock_app):
+        """Test headers are built once per token and are read-only."""
+        mock_app.acquire_token_silent.return_value = None
+        mock_app.acquire_token_for_client.return_value = {
+            "access_token": "test-token",
+            "expires_in": 3600
+        }
+
+        headers = mocked_msal_client.get_headers()
+
+        assert mocked_msal_client.get_headers() is headers
+        with pytest.raises(TypeError):
+            headers["Authorization"] = "Bearer other"
+
+    def test_msal_app_pooled_per_tenant_and_client(self, mocked_msal_client, mock_app, monkeypatch):
+        """Test clients for the same tenant and client share one MSAL app."""
+        for name, value in TEST_ENV.items():
+            monkeypatch.setenv(name, value)
+
+        assert MSALAuthClient().app is mocked_msal_client.app
+
+    def test_refresh_scheduled_from_token_lifetime(self, mocked_msal_client, mock_app):
+        """Test proactive refresh follows refresh_in, or 2/3 of the lifetime without it."""
+        key = ("https://graph.microsoft.com/.default",)
+        mock_app.acquire_token_silent.return_value = None
+        mock_app.acquire_token_for_client.return_value = {
+            "access_token": "test-token",
+            "expires_in": 3600
+        }
+
+        before = time.monotonic()
+        mocked_msal_client.get_token()
+        assert before + 2400 <= mocked_msal_client._refresh_at[key] <= time.monotonic() + 2400
+
+        mocked_msal_client._tokens.clear()
+        mock_app.acquire_token_for_client.return_value = {
+            "access_token": "test-token",
+            "expires_in": 3600,
+            "refresh_in": 1800
+        }
+
+        before = time.monotonic()
+        mocked_msal_client.get_token()
+        assert before + 1800 <= mocked_msal_client._refresh_at[key] <= time.monotonic() + 1800
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="symlinks need privileges on Windows")
+class TestTokenCacheFile:
+    """Test the persisted token cache file is not trusted or written through blindly."""
+
+    def test_load_ignores_symlinked_cache(self, tmp_path):
+        """Test a cache path that is a symlink is not deserialized."""
+        planted = tmp_path / "planted.bin"
+        planted.write_text("{}")
+        path = tmp_path / "msal_cache.bin"
+        path.symlink_to(planted)
+
+        with patch("src.auth.msal_client.msal.SerializableTokenCache") as MockCache:
+            _load_token_cache(str(path))
+
+        MockCache.return_value.deserialize.assert_not_called()
+
+    def test_save_replaces_symlink_instead_of_following_it(self, tmp_path):
+        """Test saving over a planted symlink leaves its target untouched."""
+        victim = tmp_path / "victim.txt"
+        victim.write_text("keep")
+        path = tmp_path / "cache" / "msal_cache.bin"
+        path.parent.mkdir()
+        path.symlink_to(victim)
+        cache = Mock(has_state_changed=True, serialize=Mock(return_value="{}"))
+
+        _save_token_cache(cache, str(path))
+
+        assert victim.read_text() == "keep"
+        assert not path.is_symlink()
+        assert path.read_text() == "{}"
+        assert os.stat(path).st_mode & 0o777 == 0o600
@@ -3,6 +3,7 @@ import pytest
 from unittest.mock import AsyncMock, Mock, patch
 import asyncio
 from src.bot.teams_bot import TeamsTranscriptionBot
+from src.transcription.segment import Segment
 
 
 class TestTeamsTranscriptionBotMVP:
@@ -23,9 +24,9 @@ class TestTeamsTranscriptionBotMVP:
             mock_transcriber = MockTranscriber.return_value
             mock_transcriber.start_transcription = AsyncMock()
 
-            with patch('src.auth.msal_client.MSALAuthClient') as MockAuth:
-                mock_auth = MockAuth.return_value
-                mock_auth.get_token.return_value = "mock_token"
+            with patch('src.bot.teams_bot._get_auth_client') as mock_get_auth:
+                mock_auth = mock_get_auth.return_value
+                mock_auth.get_token_async = AsyncMock(return_value="mock_token")
 
                 # Act
                 await bot.on_message_activity(turn_context)
@@ -46,9 +47,9 @@ class TestTeamsTranscriptionBotMVP:
             mock_transcriber = MockTranscriber.return_value
             mock_transcriber.start_transcription = AsyncMock()
 
-            with patch('src.auth.msal_client.MSALAuthClient') as MockAuth:
-                mock_auth = MockAuth.return_value
-                mock_auth.get_token.return_value = "mock_token"
+            with patch('src.bot.teams_bot._get_auth_client') as mock_get_auth:
+                mock_auth = mock_get_auth.return_value
+                mock_auth.get_token_async = AsyncMock(return_value="mock_token")
 
                 turn_context = Mock()
                 turn_context.activity.text = f"/join {meeting_url}"
@@ -61,6 +62,63 @@ class TestTeamsTranscriptionBotMVP:
                 mock_transcriber.start_transcription.assert_called_once()
                 assert bot.transcriber is not None
 
+    @pytest.mark.asyncio
+    async def test_bot_join_keeps_meeting_url_case(self):
+        """Test the /join command is case-insensitive but the meeting URL is kept verbatim."""
+        # Arrange
+        bot = TeamsTranscriptionBot()
+        meeting_url = "https://teams.microsoft.com/l/meetup-join/19:Meeting_AbC123"
+        turn_context = Mock()
+        turn_context.activity.text = f"/JOIN {meeting_url}"
+        turn_context.send_activity = AsyncMock()
+
+        with patch('src.bot.teams_bot.TeamsMultilingualTranscriber') as MockTranscriber, \
+                patch('src.bot.teams_bot._get_auth_client') as mock_get_auth, \
+                patch('src.bot.teams_bot.aiofiles.open', new=AsyncMock()):
+            MockTranscriber.return_value.start_transcription = AsyncMock()
+            mock_get_auth.return_value.get_token_async = AsyncMock(return_value="mock_token")
+
+            # Act
+            await bot.on_message_activity(turn_context)
+
+        # Assert
+        assert bot.active_call is not None
+        assert bot.active_call["meeting_url"] == meeting_url
+
+    @pytest.mark.asyncio
+    async def test_bot_records_segments_recognized_during_startup(self):
+        """Test segments delivered while the transcriber is starting reach the JSONL transcript."""
+        # Arrange
+        bot = TeamsTranscriptionBot()
+        turn_context = Mock()
+        meeting_url = "https://teams.microsoft.com/l/meetup-join/19:meeting_abc123"
+        turn_context.activity.text = f"/join {meeting_url}"
+        turn_context.send_activity = AsyncMock()
+        segment = Segment(segment_id=1, speaker_id="Speaker_1", text="First words",
+                          start_time="2024-01-01T12:00:00Z", confidence=0.95)
+
+        with patch('src.bot.teams_bot.TeamsMultilingualTranscriber') as MockTranscriber, \
+                patch('src.bot.teams_bot._get_auth_client') as mock_get_auth, \
+                patch('src.bot.teams_bot.aiofiles.open', new=AsyncMock()):
+            async def start_and_recognize():
+                await bot.on_transcription_received(segment)
+
+            MockTranscriber.return_value.session_id = "test_session"
+            MockTranscriber.return_value.start_transcription = AsyncMock(
+                side_effect=start_and_recognize
+            )
+            mock_get_auth.return_value.get_token_async = AsyncMock(return_value="mock_token")
+
+            # Act
+            await bot.on_message_activity(turn_context)
+
+        # Assert
+        try:
+            assert bot._jsonl is not None
+            assert b"First words" in bot._jsonl_buffer
+        finally:
+            bot._jsonl_flush_task.cancel()
+
     @pytest.mark.asyncio
     async def test_bot_handles_audio_stream(self):
         """Test bot receives audio stream and sends to Speech-to-Text."""
@@ -84,19 +142,109 @@ class TestTeamsTranscriptionBotMVP:
         """Test bot receives transcribed text with speaker identification."""
         # Arrange
         bot = TeamsTranscriptionBot()
-        transcription_result = {
-            "speaker_id": "Speaker_1",
-            "text": "Hello, this is a test",
-            "timestamp": "2024-01-01T12:00:00Z"
-        }
+        segment = Segment(
+            segment_id=1,
+            speaker_id="Speaker_1",
+            text="Hello, this is a test",
+            start_time="2024-01-01T12:00:00Z",
+            confidence=0.95
+        )
 
         # Act
-        await bot.on_transcription_received(transcription_result)
+        await bot.on_transcription_received(segment)
 
         # Assert
         assert len(bot.transcript_entries) == 1
-        assert bot.transcript_entries[0]["speaker_id"] == "Speaker_1"
-        assert bot.transcript_entries[0]["text"] == "Hello, this is a test"
+        assert bot.transcript_entries[0].speaker_id == "Speaker_1"
+        assert bot.transcript_entries[0].text == "Hello, this is a test"
+
+    @pytest.mark.asyncio
+    async def test_bot_buffers_transcript_lines_until_flush(self):
+        """Test JSONL transcript lines are batched in memory and written in one call."""
+        # Arrange
+        bot = TeamsTranscriptionBot()
+        bot._jsonl = AsyncMock()
+        segments = [
+            Segment(segment_id=i, speaker_id="Speaker_1", text=f"Line {i}",
+                    start_time="2024-01-01T12:00:00Z", confidence=0.95)
+            for i in (1, 2)
+        ]
+
+        # Act
+        for segment in segments:
+            await bot.on_transcription_received(segment)
+
+        # Assert
+        bot._jsonl.write.assert_not_called()
+        await bot._flush_transcript()
+        bot._jsonl.write.assert_awaited_once()
+        assert bot._jsonl.write.await_args.args[0].count(b"\n") == 2
+
+    @pytest.mark.asyncio
+    async def test_bot_buffers_transcript_lines_before_file_opens(self):
+        """Test segments arriving before the JSONL file is open are kept and written once it is."""
+        # Arrange
+        bot = TeamsTranscriptionBot()
+        segment = Segment(segment_id=1, speaker_id="Speaker_1", text="Early line",
+                          start_time="2024-01-01T12:00:00Z", confidence=0.95)
+
+        # Act
+        await bot.on_transcription_received(segment)
+        await bot._flush_transcript()
+        bot._jsonl = AsyncMock()
+        await bot._flush_transcript()
+
+        # Assert
+        bot._jsonl.write.assert_awaited_once()
+        assert b"Early line" in bot._jsonl.write.await_args.args[0]
+
+    @pytest.mark.asyncio
+    async def test_bot_serializes_transcript_flushes(self):
+        """Test a flush waits for the write in progress, so batches land in order."""
+        # Arrange
+        bot = TeamsTranscriptionBot()
+        written = []
+
+        async def write(data):
+            # The first batch is slow to write; without serialization the second would overtake it
+            await asyncio.sleep(0.01 if b"Line 1" in data else 0)
+            written.append(data)
+
+        bot._jsonl = AsyncMock()
+        bot._jsonl.write = write
+
+        # Act
+        bot._jsonl_buffer += b'{"text": "Line 1"}\n'
+        first = asyncio.create_task(bot._flush_transcript())
+        await asyncio.sleep(0)
+        bot._jsonl_buffer += b'{"text": "Line 2"}\n'
+        await asyncio.gather(first, bot._flush_transcript())
+
+        # Assert
+        assert [b"Line 1" in data for data in written] == [True, False]
+
+    @pytest.mark.asyncio
+    async def test_bot_close_stops_flush_task_before_final_write(self):
+        """Test closing the transcript lets the flush task exit instead of cancelling it."""
+        # Arrange
+        bot = TeamsTranscriptionBot()
+        jsonl = bot._jsonl = AsyncMock()
+        jsonl.fileno = Mock(return_value=3)
+        bot._jsonl_path = "transcript.jsonl"
+        bot._jsonl_flush_task = asyncio.create_task(bot._flush_transcript_periodically())
+        flush_task = bot._jsonl_flush_task
+        bot._jsonl_buffer += b'{"text": "Last line"}\n'
+
+        # Act
+        with patch('src.bot.teams_bot.os.fsync'):
+            path = await bot._close_transcript_stream()
+
+        # Assert
+        assert path == "transcript.jsonl"
+        assert flush_task.done() and not flush_task.cancelled()
+        jsonl.write.assert_awaited_once()
+        jsonl.close.assert_awaited_once()
+        assert bot._jsonl is None
 
     @pytest.mark.asyncio
     async def test_bot_leaves_call_and_saves_transcript(self):
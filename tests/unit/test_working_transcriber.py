@@ -0,0 +1,71 @@
+"""Test WorkingTranscriber session lifecycle."""
+import asyncio
+import pytest
+from unittest.mock import Mock, patch
+import working_transcriber
+from working_transcriber import WorkingTranscriber
+
+TEST_ENV = {
+    "AZURE_SPEECH_KEY": "test-speech-key",
+    "AZURE_SPEECH_REGION": "test-region"
+}
+
+
+@pytest.fixture
+def transcriber():
+    """A WorkingTranscriber over a mocked recognizer whose start/stop futures resolve at once."""
+    with patch.dict("os.environ", TEST_ENV), \
+            patch.object(working_transcriber.speechsdk, "SpeechConfig"), \
+            patch.object(working_transcriber.speechsdk, "AudioConfig"), \
+            patch.object(working_transcriber.speechsdk, "SpeechRecognizer"):
+        yield WorkingTranscriber()
+
+
+def _recognized_event(text):
+    """A recognized event as the SDK thread delivers it."""
+    evt = Mock()
+    evt.result.reason = working_transcriber.speechsdk.ResultReason.RecognizedSpeech
+    evt.result.text = text
+    evt.result.offset = 0
+    evt.result.duration = 10_000_000
+    return evt
+
+
+def _drain_tasks():
+    return [t for t in asyncio.all_tasks() if t.get_coro().__name__ == "_drain" and not t.done()]
+
+
+class TestWorkingTranscriberLifecycle:
+    """Test start/stop across canceled sessions."""
+
+    @pytest.mark.asyncio
+    async def test_stop_after_cancel_flushes_and_restarts_once(self, transcriber):
+        """Test a canceled session is stopped and flushed, and a restart runs one drain task."""
+        await transcriber.start_transcription()
+        transcriber._on_recognized(_recognized_event("last words before the error"))
+        transcriber._on_canceled(Mock())
+
+        await transcriber.stop_transcription()
+
+        transcriber.recognizer.stop_continuous_recognition_async.assert_called_once()
+        assert transcriber._drain_task is None
+        assert [s.text for s in transcriber.get_transcript()] == ["last words before the error"]
+
+        await transcriber.start_transcription()
+        try:
+            assert len(_drain_tasks()) == 1
+        finally:
+            await transcriber.stop_transcription()
+        assert _drain_tasks() == []
+
+    @pytest.mark.asyncio
+    async def test_reset_refused_until_canceled_session_is_stopped(self, transcriber):
+        """Test reset() waits for stop_transcription() even after the session was canceled."""
+        await transcriber.start_transcription()
+        transcriber._on_canceled(Mock())
+
+        with pytest.raises(RuntimeError, match="Stop transcription"):
+            transcriber.reset()
+
+        await transcriber.stop_transcription()
+        transcriber.reset()
@@ -1,14 +1,26 @@
 #!/usr/bin/env python3
 """Capture transcription and save to structured transcript file."""
 import asyncio
+import logging
 import os
-import json
-from datetime import datetime, UTC
+import time
+from collections import deque
+from datetime import datetime, timedelta, UTC
 from dotenv import load_dotenv
+import orjson
 import azure.cognitiveservices.speech as speechsdk
+from src.monitoring.queue_logging import start_queue_logging
+from src.transcription.segment import Segment
 
 load_dotenv()
 
+# Handlers are attached by start_queue_logging() when run as a script
+logger = logging.getLogger(__name__)
+
+# Recognized events handled per drain pass, and the idle poll interval between passes
+DRAIN_BATCH_SIZE = 32
+DRAIN_INTERVAL = 0.05
+
 
 async def create_transcript_file():
     """Create a structured transcript file from live audio."""
@@ -29,51 +41,93 @@ async def create_transcript_file():
     audio_config = speechsdk.AudioConfig(use_default_microphone=True)
     recognizer = speechsdk.SpeechRecognizer(speech_config=speech_config, audio_config=audio_config)
 
-    # Transcript data
-    transcript_data = {
-        "session_id": f"session_{datetime.now(UTC).strftime('%Y%m%d_%H%M%S')}",
-        "start_time": datetime.now(UTC).isoformat(),
+    # Wall-clock anchor for the session; per-segment times are monotonic offsets from it
+    t0_wall = datetime.now(UTC)
+    t0_mono = time.monotonic_ns()
+    session_id = f"session_{t0_wall.strftime('%Y%m%d_%H%M%S')}"
+
+    # Session metadata; segments are streamed to NDJSON as they arrive
+    session_meta = {
+        "session_id": session_id,
+        "start_time": t0_wall,
         "source": "microphone_test",
         "language": "en-US",
-        "segments": []
+        "format": "ndjson"
     }
 
+    filename = f"transcript_{session_id}.ndjson"
+    filepath = os.path.join(os.getcwd(), filename)
+    meta_filepath = os.path.join(os.getcwd(), f"transcript_{session_id}.meta.json")
+
+    # Header written up front, so a crashed capture still leaves a readable session
+    with open(meta_filepath, 'wb') as meta_file:
+        meta_file.write(orjson.dumps(session_meta, option=orjson.OPT_INDENT_2))
+
+    # One JSON object per line; lines are buffered within a drain pass and flushed at its end,
+    # so a crash loses at most the batch being processed
+    segments_file = open(filepath, 'wb', buffering=1 << 16)
+
     segment_counter = 0
     speaker_counter = 0
-    last_speech_time = None
+    last_speech_ns = None
 
-    def on_recognized(evt):
-        nonlocal segment_counter, speaker_counter, last_speech_time
+    # Raw recognized events from the SDK thread; deque appends/pops are atomic under the GIL
+    events = deque()
 
+    def on_recognized(evt):
+        # Runs on the SDK thread; just queue the result for the drain task
         if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
-            text = evt.result.text.strip()
-            if text:
-                current_time = datetime.now(UTC)
-
-                # Simple speaker diarization (gaps > 3 seconds = new speaker)
-                if (last_speech_time is None or
-                    (current_time.timestamp() - last_speech_time) > 3):
-                    speaker_counter += 1
-
-                last_speech_time = current_time.timestamp()
-                segment_counter += 1
-
-                segment = {
-                    "segment_id": segment_counter,
-                    "speaker_id": f"Speaker_{speaker_counter}",
-                    "text": text,
-                    "start_time": current_time.isoformat(),
-                    "confidence": 0.95,
-                    "duration_ms": int(evt.result.duration / 10000),  # Convert to milliseconds
-                    "offset_ms": int(evt.result.offset / 10000)
-                }
-
-                transcript_data["segments"].append(segment)
-                print(f"📝 Segment {segment_counter}: [{segment['speaker_id']}] {text[:50]}...")
+            events.append(
+                (time.monotonic_ns(), evt.result.text, evt.result.offset, evt.result.duration)
+            )
+
+    def process_events(limit=None):
+        nonlocal segment_counter, speaker_counter, last_speech_ns
+
+        handled = 0
+        while events and (limit is None or handled < limit):
+            now_ns, text, offset, duration = events.popleft()
+            handled += 1
+
+            text = text.strip()
+            if not text:
+                continue
+
+            # Simple speaker diarization (gaps > 3 seconds = new speaker)
+            if last_speech_ns is None or now_ns - last_speech_ns > 3_000_000_000:
+                speaker_counter += 1
+
+            last_speech_ns = now_ns
+            segment_counter += 1
+            delta_ns = now_ns - t0_mono
+
+            segment = Segment(
+                segment_id=segment_counter,
+                speaker_id=f"Speaker_{speaker_counter}",
+                text=text,
+                start_time=(t0_wall + timedelta(microseconds=delta_ns // 1000)).isoformat(),
+                confidence=0.95,
+                duration_ms=duration // 10000,  # Convert 100ns ticks to milliseconds
+                offset_ms=offset // 10000
+            )
+
+            # orjson serializes the slots dataclass directly, no intermediate dict
+            segments_file.write(orjson.dumps(segment) + b"\n")
+            logger.info("📝 Segment %d: [%s] %s...", segment_counter, segment.speaker_id, text[:50])
+
+        if handled:
+            segments_file.flush()
+        return handled
+
+    async def drain():
+        while True:
+            handled = process_events(DRAIN_BATCH_SIZE)
+            # Yield between full batches; otherwise wait for the SDK to queue more
+            await asyncio.sleep(0 if handled == DRAIN_BATCH_SIZE else DRAIN_INTERVAL)
 
     def on_recognizing(evt):
         if evt.result.text.strip():
-            print(f"🎤 Live: {evt.result.text[:50]}...", end='\r')
+            logger.info("🎤 Live: %s...", evt.result.text[:50])
 
     # Connect handlers
     recognizer.recognized.connect(on_recognized)
@@ -85,51 +139,61 @@ async def create_transcript_file():
 
     # Start recognition
     recognizer.start_continuous_recognition()
+    drain_task = asyncio.create_task(drain())
 
     # Capture for 30 seconds
     for i in range(30):
         await asyncio.sleep(1)
         if i % 10 == 0 and i > 0:
-            print(f"\n⏰ {30-i} seconds remaining... ({len(transcript_data['segments'])} segments captured)")
+            print(f"\n⏰ {30-i} seconds remaining... ({segment_counter} segments captured)")
 
     # Stop recognition
     recognizer.stop_continuous_recognition()
 
-    # Finalize transcript
-    transcript_data["end_time"] = datetime.now(UTC).isoformat()
-    transcript_data["total_segments"] = len(transcript_data["segments"])
-    transcript_data["total_speakers"] = speaker_counter
+    # Stop the drain task, then write out whatever was queued before recognition stopped
+    drain_task.cancel()
+    try:
+        await drain_task
+    except asyncio.CancelledError:
+        pass
+    process_events()
+    segments_file.close()
 
-    # Save to file
-    filename = f"transcript_{transcript_data['session_id']}.json"
-    filepath = os.path.join(os.getcwd(), filename)
+    # Finalize session metadata
+    session_meta["end_time"] = datetime.now(UTC)
+    session_meta["total_segments"] = segment_counter
+    session_meta["total_speakers"] = speaker_counter
 
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(transcript_data, f, indent=2, ensure_ascii=False)
+    with open(meta_filepath, 'wb') as meta_file:
+        meta_file.write(orjson.dumps(session_meta, option=orjson.OPT_INDENT_2))
 
     print(f"\n💾 Transcript saved to: {filename}")
     print(f"📊 Summary:")
-    print(f"   • Total segments: {transcript_data['total_segments']}")
-    print(f"   • Speakers detected: {transcript_data['total_speakers']}")
+    print(f"   • Total segments: {session_meta['total_segments']}")
+    print(f"   • Speakers detected: {session_meta['total_speakers']}")
     print(f"   • Duration: 30 seconds")
     print(f"   • File size: {os.path.getsize(filepath)} bytes")
 
-    # Create a human-readable version too
-    txt_filename = f"transcript_{transcript_data['session_id']}.txt"
+    # Create a human-readable version too, streaming segments back from the NDJSON file
+    txt_filename = f"transcript_{session_id}.txt"
     txt_filepath = os.path.join(os.getcwd(), txt_filename)
 
-    with open(txt_filepath, 'w', encoding='utf-8') as f:
-        f.write(f"TRANSCRIPT - {transcript_data['session_id']}\n")
-        f.write(f"Started: {transcript_data['start_time']}\n")
-        f.write(f"Language: {transcript_data['language']}\n")
+    with open(filepath, 'rb') as segments, open(txt_filepath, 'w', encoding='utf-8') as f:
+        f.write(f"TRANSCRIPT - {session_id}\n")
+        f.write(f"Started: {session_meta['start_time'].isoformat()}\n")
+        f.write(f"Language: {session_meta['language']}\n")
         f.write("=" * 50 + "\n\n")
 
-        for segment in transcript_data["segments"]:
+        for line in segments:
+            segment = orjson.loads(line)
             timestamp = segment["start_time"][11:19]  # Just time part
             f.write(f"[{timestamp}] {segment['speaker_id']}: {segment['text']}\n")
 
         f.write(f"\n" + "=" * 50)
-        f.write(f"\nTotal: {transcript_data['total_segments']} segments, {transcript_data['total_speakers']} speakers")
+        f.write(
+            f"\nTotal: {session_meta['total_segments']} segments, "
+            f"{session_meta['total_speakers']} speakers"
+        )
 
     print(f"📄 Human-readable version: {txt_filename}")
 
@@ -137,10 +201,11 @@ async def create_transcript_file():
 
 
 if __name__ == "__main__":
+    start_queue_logging(logger)
     try:
         json_file, txt_file = asyncio.run(create_transcript_file())
         print(f"\n✅ Files created successfully!")
-        print(f"   JSON: {json_file}")
+        print(f"   NDJSON: {json_file}")
         print(f"   TXT:  {txt_file}")
     except KeyboardInterrupt:
         print("\n🛑 Interrupted")
@@ -1,15 +1,27 @@
 #!/usr/bin/env python3
 """Working transcriber using basic SpeechRecognizer with simulated speaker diarization."""
 import asyncio
+import inspect
+import logging
 import os
-import sys
 import time
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timedelta, UTC
 from dotenv import load_dotenv
+from typing import List, Optional
 import azure.cognitiveservices.speech as speechsdk
+from src.monitoring.queue_logging import start_queue_logging
+from src.transcription.segment import Segment
 
 load_dotenv()
 
+# Handlers are attached by start_queue_logging() when run as a script
+logger = logging.getLogger(__name__)
+
+# Recognized events handled per drain pass, and the idle poll interval between passes
+DRAIN_BATCH_SIZE = 32
+DRAIN_INTERVAL = 0.05
+
 
 class WorkingTranscriber:
     """Working transcriber that captures real speech with basic speaker identification."""
@@ -28,40 +40,60 @@ class WorkingTranscriber:
         )
         self.speech_config.speech_recognition_language = "en-US"
 
-        self.recognizer = None
         self.is_transcribing = False
-        self.transcript_entries = []
+        self.transcript_entries: List[Segment] = []
         self.on_transcription_callback = on_transcription_callback
         self.speaker_counter = 0
-        self.last_speech_time = None
+        self.segment_counter = 0
+        self.last_speech_time = None  # time.monotonic_ns() of the last final result
+
+        # Wall-clock anchor and matching monotonic reading, set when transcription starts
+        self._t0_wall: datetime = datetime.now(UTC)
+        self._t0_mono: int = time.monotonic_ns()
+
+        # Raw recognized events from the SDK thread; deque appends/pops are atomic under the GIL
+        self._events: deque = deque()
+        self._drain_task: Optional[asyncio.Task] = None
+
+        # One recognizer, with handlers wired once, reused across start/stop cycles
+        self.recognizer = self._create_recognizer()
+
+    def _create_recognizer(self):
+        """Create a recognizer on the default microphone with event handlers connected."""
+        audio_config = speechsdk.AudioConfig(use_default_microphone=True)
+        recognizer = speechsdk.SpeechRecognizer(
+            speech_config=self.speech_config,
+            audio_config=audio_config
+        )
+
+        recognizer.recognized.connect(self._on_recognized)
+        recognizer.recognizing.connect(self._on_recognizing)
+        recognizer.canceled.connect(self._on_canceled)
+        recognizer.session_stopped.connect(self._on_session_stopped)
+
+        print("✅ Speech recognizer created")
+        return recognizer
+
+    def reset(self):
+        """Rebuild the recognizer, e.g. after changing speech_config; only valid while stopped."""
+        if self.is_transcribing or self._drain_task:
+            raise RuntimeError("Stop transcription before resetting the recognizer")
+        self.recognizer = self._create_recognizer()
 
     async def start_transcription(self):
         """Start real Azure Speech transcription."""
-        if self.is_transcribing:
+        if self.is_transcribing or self._drain_task:
             print("⚠️  Already transcribing")
             return
 
         try:
-            # Create audio config for default microphone
-            audio_config = speechsdk.AudioConfig(use_default_microphone=True)
-
-            # Create recognizer
-            self.recognizer = speechsdk.SpeechRecognizer(
-                speech_config=self.speech_config,
-                audio_config=audio_config
-            )
-
-            print("✅ Speech recognizer created")
-
-            # Set up event handlers
-            self.recognizer.recognized.connect(self._on_recognized)
-            self.recognizer.recognizing.connect(self._on_recognizing)
-            self.recognizer.canceled.connect(self._on_canceled)
-            self.recognizer.session_stopped.connect(self._on_session_stopped)
-
             # Start continuous recognition
-            self.recognizer.start_continuous_recognition()
+            self._t0_wall = datetime.now(UTC)
+            self._t0_mono = time.monotonic_ns()
+            # Wait for the SDK on a worker thread so the event loop stays responsive
+            await asyncio.to_thread(self.recognizer.start_continuous_recognition_async().get)
             self.is_transcribing = True
+            self._drain_task = asyncio.create_task(self._drain())
 
             print("🎤 Real-time transcription started!")
             print("💡 Speak clearly into your microphone")
@@ -71,76 +103,116 @@ class WorkingTranscriber:
             raise
 
     async def stop_transcription(self):
-        """Stop transcription."""
-        if not self.is_transcribing or not self.recognizer:
+        """Stop transcription, then handle every event the SDK queued before it stopped."""
+        # A canceled or ended session still owns a drain task that has to be stopped and flushed
+        if not self.is_transcribing and not self._drain_task:
             print("⚠️  Not currently transcribing")
             return
 
         try:
-            self.recognizer.stop_continuous_recognition()
-            self.is_transcribing = False
-            self.recognizer = None
+            # Always stop the SDK session, even a canceled one, so the reused recognizer is idle
+            await asyncio.to_thread(self.recognizer.stop_continuous_recognition_async().get)
             print("⏹️  Transcription stopped")
 
         except Exception as e:
             print(f"❌ Error stopping transcription: {e}")
             raise
 
+        finally:
+            self.is_transcribing = False
+
+            # Stop the drain worker, then handle whatever the SDK queued before stopping
+            if self._drain_task:
+                self._drain_task.cancel()
+                try:
+                    await self._drain_task
+                except asyncio.CancelledError:
+                    pass
+                self._drain_task = None
+            await self._process_events()
+
     def _on_recognized(self, evt):
-        """Handle final recognition results."""
-        if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech and evt.result.text.strip():
-            # Simulate speaker diarization based on timing
-            current_time = time.time()
+        """Queue final recognition results; runs on the SDK thread, so keep it to one append."""
+        if evt.result.reason == speechsdk.ResultReason.RecognizedSpeech:
+            self._events.append(
+                (time.monotonic_ns(), evt.result.text, evt.result.offset, evt.result.duration)
+            )
+
+    async def _drain(self):
+        """Handle queued recognition events on the event loop, in batches."""
+        while True:
+            handled = await self._process_events(DRAIN_BATCH_SIZE)
+            # Yield between full batches; otherwise wait for the SDK to queue more
+            await asyncio.sleep(0 if handled == DRAIN_BATCH_SIZE else DRAIN_INTERVAL)
+
+    async def _process_events(self, limit: Optional[int] = None) -> int:
+        """Turn up to limit queued events into transcript entries; returns how many were taken."""
+        handled = 0
+        while self._events and (limit is None or handled < limit):
+            now_ns, text, offset, duration = self._events.popleft()
+            handled += 1
+
+            text = text.strip()
+            if not text:
+                continue
 
+            # Simulate speaker diarization based on timing
             # If significant gap since last speech (>3 seconds), assume new speaker
-            if (self.last_speech_time is None or
-                current_time - self.last_speech_time > 3):
+            new_speaker = (
+                self.last_speech_time is None or now_ns - self.last_speech_time > 3_000_000_000
+            )
+            if new_speaker:
                 self.speaker_counter += 1
 
             speaker_id = f"Speaker_{self.speaker_counter}"
-            self.last_speech_time = current_time
+            self.last_speech_time = now_ns
+            self.segment_counter += 1
+            delta_ns = now_ns - self._t0_mono
 
             # Create transcription result
-            result = {
-                'speaker_id': speaker_id,
-                'text': evt.result.text.strip(),
-                'timestamp': datetime.utcnow().isoformat(),
-                'confidence': 0.95,  # Azure doesn't provide confidence for basic recognizer
-                'offset': evt.result.offset,
-                'duration': evt.result.duration
-            }
+            result = Segment(
+                segment_id=self.segment_counter,
+                speaker_id=speaker_id,
+                text=text,
+                start_time=(self._t0_wall + timedelta(microseconds=delta_ns // 1000)).isoformat(),
+                confidence=0.95,  # Azure doesn't provide confidence for basic recognizer
+                duration_ms=duration // 10000,  # Convert 100ns ticks to milliseconds
+                offset_ms=offset // 10000
+            )
 
             # Store result
             self.transcript_entries.append(result)
 
             # Display result
-            print(f"📝 [{speaker_id}]: {result['text']}")
+            logger.info("📝 [%s]: %s", speaker_id, result.text)
 
-            # Call callback if provided
+            # Call callback if provided; both plain functions and coroutines are accepted
             if self.on_transcription_callback:
                 try:
-                    asyncio.create_task(self.on_transcription_callback(result))
+                    outcome = self.on_transcription_callback(result)
+                    if inspect.isawaitable(outcome):
+                        await outcome
                 except Exception as e:
-                    print(f"❌ Callback error: {e}")
+                    logger.error("❌ Callback error: %s", e)
+
+        return handled
 
     def _on_recognizing(self, evt):
         """Handle interim recognition results."""
         if evt.result.text.strip():
-            print(f"🔄 Recognizing: {evt.result.text}")
+            logger.info("🔄 Recognizing: %s", evt.result.text)
 
     def _on_canceled(self, evt):
         """Handle cancellation."""
-        print(f"❌ Recognition canceled: {evt.cancellation_details.reason}")
+        logger.error("❌ Recognition canceled: %s", evt.cancellation_details.reason)
         if evt.cancellation_details.error_details:
-            print(f"   Error: {evt.cancellation_details.error_details}")
-        self.is_transcribing = False
+            logger.error("   Error: %s", evt.cancellation_details.error_details)
 
     def _on_session_stopped(self, evt):
         """Handle session stopped."""
-        print("🔴 Recognition session stopped")
-        self.is_transcribing = False
+        logger.info("🔴 Recognition session stopped")
 
-    def get_transcript(self):
+    def get_transcript(self) -> List[Segment]:
         """Get all transcript entries."""
         return self.transcript_entries.copy()
 
@@ -148,6 +220,9 @@ class WorkingTranscriber:
         """Clear transcript entries."""
         self.transcript_entries.clear()
         self.speaker_counter = 0
+        self.segment_counter = 0
+        # Without this, speech within 3s of the clear would be attributed to Speaker_0
+        self.last_speech_time = None
         print("🗑️  Transcript cleared")
 
 
@@ -158,7 +233,7 @@ async def test_working_transcriber():
 
     def on_transcription(result):
         """Handle transcription results."""
-        print(f"💾 Saved: [{result['speaker_id']}] {result['text']}")
+        print(f"💾 Saved: [{result.speaker_id}] {result.text}")
 
     try:
         # Create transcriber
@@ -187,9 +262,9 @@ async def test_working_transcriber():
         print("=" * 40)
 
         for i, entry in enumerate(transcript, 1):
-            print(f"{i:2d}. [{entry['speaker_id']}] {entry['text']}")
-            print(f"    Time: {entry['timestamp']}")
-            print(f"    Confidence: {entry['confidence']}")
+            print(f"{i:2d}. [{entry.speaker_id}] {entry.text}")
+            print(f"    Time: {entry.start_time}")
+            print(f"    Confidence: {entry.confidence}")
             print()
 
         if not transcript:
@@ -205,6 +280,7 @@ async def test_working_transcriber():
 
 
 if __name__ == "__main__":
+    start_queue_logging(logger)
     try:
         asyncio.run(test_working_transcriber())
     except KeyboardInterrupt: